@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from fastapi import APIRouter, Depends
+
+from backend.common.executor import bounded_executors
+from backend.common.response.base import response_base
+from backend.common.security.jwt import DependsJwtAuth
+from backend.common.security.rbac import RequestPermission
+from backend.utils.cache import local_caches
+
+router = APIRouter()
+
+
+@router.get(
+    "/cache",
+    summary="获取进程内缓存指标",
+    dependencies=[DependsJwtAuth, Depends(RequestPermission("sys:monitor:view"))],
+)
+async def get_cache_stats():
+    data = [cache.stats() for cache in local_caches.values()]
+    return response_base.success(data=data)
+
+
+@router.get(
+    "/executor",
+    summary="获取执行器指标",
+    dependencies=[DependsJwtAuth, Depends(RequestPermission("sys:monitor:view"))],
+)
+async def get_executor_stats():
+    data = [executor.stats() for executor in bounded_executors.values()]
+    return response_base.success(data=data)
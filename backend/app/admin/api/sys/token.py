@@ -2,11 +2,20 @@
 # -*- coding: utf-8 -*-
 
 from typing import Annotated
-from fastapi import APIRouter, Query, Request, Path
+from fastapi import APIRouter, Depends, Query, Request, Path, WebSocket, status
 
-from backend.app.admin.schema.token import KickOutToken
+from backend.app.admin.schema.token import KickOutToken, TokenIntrospectParam
 from backend.common.response.base import response_base
-from backend.common.security.jwt import DependsJwtAuth, admin_verify
+from backend.common.exception.errors import AuthorizationError, TokenError
+from backend.common.security.jwt import (
+    DependsJwtAuth,
+    get_token,
+    jwt_decode,
+    session_authentication,
+)
+from backend.common.security.internal import DependsInternalAuth
+from backend.common.security.rbac import RequestPermission
+from backend.common.security.session_event import session_event_hub
 
 from backend.app.admin.service.token import token_service
 from backend.database.redis import redis_client
@@ -16,15 +25,74 @@ from backend.core.config import settings
 router = APIRouter()
 
 
-@router.get("/list", summary="获取token列表", dependencies=[DependsJwtAuth])
-async def get_token_list():
-    data = await token_service.get_token_list()
+@router.get(
+    "/list", summary="获取token列表",
+    dependencies=[DependsJwtAuth, Depends(RequestPermission("sys:token:list"))],
+)
+async def get_token_list(
+    username: Annotated[str | None, Query(description="用户名")] = None,
+    cursor: Annotated[str | None, Query(description="游标，上一页返回的 next_cursor")] = None,
+    size: Annotated[int, Query(description="每页数量", ge=1, le=200)] = 20,
+):
+    data = await token_service.get_token_list(username=username, cursor=cursor, size=size)
+    return response_base.success(data=data)
+
+
+@router.get(
+    "/online", summary="获取在线会话",
+    dependencies=[DependsJwtAuth, Depends(RequestPermission("sys:token:list"))],
+)
+async def get_online_sessions():
+    data = await token_service.get_online_sessions()
+    return response_base.success(data=data)
+
+
+@router.post(
+    "/introspect", summary="批量校验token（内部服务）", dependencies=[DependsInternalAuth]
+)
+async def introspect_tokens(obj: TokenIntrospectParam):
+    data = await token_service.introspect(obj.tokens)
     return response_base.success(data=data)
 
 
-@router.delete("/{user_id}", summary="删除token", dependencies=[DependsJwtAuth])
+@router.delete(
+    "/{user_id}",
+    summary="删除token",
+    dependencies=[DependsJwtAuth, Depends(RequestPermission("sys:token:kick"))],
+)
 async def kick_out(
     request: Request, user_id: Annotated[int, Path(...)], KickOutToken: KickOutToken
 ):
     await token_service.kick_out(request, user_id, KickOutToken)
     return response_base.success(msg="退出成功")
+
+
+@router.post("/events/ticket", summary="获取会话事件连接票据", dependencies=[DependsJwtAuth])
+async def create_event_ticket(request: Request):
+    session_uuid = jwt_decode(get_token(request)).session_uuid
+    ticket = await session_event_hub.issue_ticket(request.user.id, session_uuid)
+    return response_base.success(data={"ticket": ticket})
+
+
+@router.websocket("/events")
+async def session_events(websocket: WebSocket, ticket: Annotated[str, Query(...)]):
+    # 浏览器 WebSocket 无法设置请求头，使用一次性短期票据而非 token，URL 会出现在访问日志中
+    session = await session_event_hub.consume_ticket(ticket)
+    if session is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    user_id, session_uuid = session
+    try:
+        user = await session_authentication(user_id, session_uuid)
+    except (TokenError, AuthorizationError):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    await session_event_hub.connect(websocket, user.id, session_uuid, is_admin=user.is_admin)
+    try:
+        # 仅推送事件，忽略客户端消息，直到连接断开
+        async for _ in websocket.iter_text():
+            pass
+    finally:
+        await session_event_hub.disconnect(websocket, user.id, session_uuid)
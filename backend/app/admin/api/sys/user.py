@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
 from backend.app.admin.schema.user import RegisterUser, UpdateUser, UserInfoDetail
 from backend.app.admin.service.user import user_service
@@ -12,6 +12,7 @@ from backend.common.response.base import (
     response_base,
 )
 from backend.common.security.jwt import DependsJwtAuth
+from backend.common.security.rbac import RequestPermission
 from backend.database.mysql import CurrentSession
 from backend.utils.serializers import select_as_dict
 
@@ -25,7 +26,9 @@ async def register_user(obj: RegisterUser) -> ResponseModel:
 
 
 @router.delete(
-    "/deleteUser", summary="通过 id 删除用户信息", dependencies=[DependsJwtAuth]
+    "/deleteUser",
+    summary="通过 id 删除用户信息",
+    dependencies=[DependsJwtAuth, Depends(RequestPermission("sys:user:delete"))],
 )
 async def delete_user(id: int) -> ResponseModel:
     count = await user_service.delete(id=id)
@@ -37,7 +40,7 @@ async def delete_user(id: int) -> ResponseModel:
 @router.put(
     "/updateUser",
     summary="通过 id 更新用户必要的信息，不可修改状态等",
-    dependencies=[DependsJwtAuth],
+    dependencies=[DependsJwtAuth, Depends(RequestPermission("sys:user:update"))],
 )
 async def update_user(id: int, obj: UpdateUser) -> ResponseModel:
     count = await user_service.update(id=id, obj=obj)
@@ -62,7 +65,11 @@ async def get_user(id: int) -> ResponseModel:
     "/list",
     summary="获取用户详情信息",
     response_model=ResponseSchemaModel[PageData[UserInfoDetail]],
-    dependencies=[DependsJwtAuth, DependsPagination],
+    dependencies=[
+        DependsJwtAuth,
+        Depends(RequestPermission("sys:user:list")),
+        DependsPagination,
+    ],
 )
 async def get_user_list(
     db: CurrentSession,
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy_crud_plus import CRUDPlus
+
+from backend.app.admin.model import Permission, Role, sys_role_permission, sys_user_role
+
+
+class CRUDPermission(CRUDPlus[Permission]):
+    async def get_codes_by_user(self, db: AsyncSession, user_id: int) -> list[str]:
+        """获取用户所有正常角色的权限标识"""
+        stmt = (
+            select(self.model.code)
+            .distinct()
+            .join(sys_role_permission, sys_role_permission.c.permission_id == self.model.id)
+            .join(Role, Role.id == sys_role_permission.c.role_id)
+            .join(sys_user_role, sys_user_role.c.role_id == Role.id)
+            .where(sys_user_role.c.user_id == user_id, Role.status == 1)
+        )
+        result = await db.execute(stmt)
+        return list(result.scalars().all())
+
+
+permission_crud: CRUDPermission = CRUDPermission(Permission)
@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import bcrypt
 from sqlalchemy import desc, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy_crud_plus import CRUDPlus
@@ -15,11 +14,10 @@ class CRUDUser(CRUDPlus[User]):
     async def create(self, db: AsyncSession, obj: RegisterUser):
         """创建用户"""
 
-        salt = bcrypt.gensalt()
-        obj.password = get_hash_password(obj.password, salt)
+        obj.password = await get_hash_password(obj.password)
 
         dict_user = obj.model_dump()
-        dict_user.update({"salt": salt, "username": obj.phone})
+        dict_user.update({"username": obj.phone})
 
         new_user = self.model(**dict_user)
         db.add(new_user)
@@ -50,6 +48,17 @@ class CRUDUser(CRUDPlus[User]):
         """更新用户信息"""
         return await self.update_model(db, user_id, obj)
 
+    async def update_password(self, db: AsyncSession, user_id: int, password: str) -> int:
+        """
+        更新用户密码哈希值
+
+        :param db:
+        :param user_id:
+        :param password: 已加密的密码哈希值
+        :return:
+        """
+        return await self.update_model(db, user_id, {"password": password})
+
     async def update_login_time(self, db: AsyncSession, phone: str) -> int:
         """
         更新用户登录时间
@@ -1,3 +1,6 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+from .m2m import sys_role_permission, sys_user_role
+from .permission import Permission
+from .role import Role
 from .user import User
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from sqlalchemy import Column, ForeignKey, Integer, Table
+
+from backend.common.model import MappedBase
+
+# 用户角色表
+sys_user_role = Table(
+    "sys_user_role",
+    MappedBase.metadata,
+    Column("user_id", Integer, ForeignKey("sys_user.id", ondelete="CASCADE"), primary_key=True, comment="用户ID"),
+    Column("role_id", Integer, ForeignKey("sys_role.id", ondelete="CASCADE"), primary_key=True, comment="角色ID"),
+)
+
+# 角色权限表
+sys_role_permission = Table(
+    "sys_role_permission",
+    MappedBase.metadata,
+    Column("role_id", Integer, ForeignKey("sys_role.id", ondelete="CASCADE"), primary_key=True, comment="角色ID"),
+    Column(
+        "permission_id",
+        Integer,
+        ForeignKey("sys_permission.id", ondelete="CASCADE"),
+        primary_key=True,
+        comment="权限ID",
+    ),
+)
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.common.model import Base, id_key
+
+
+class Permission(Base):
+    """
+    权限表
+        - `code` 权限标识，与路由声明的 `RequestPermission` 一致，如 `sys:user:delete`
+    """
+
+    __tablename__ = "sys_permission"  # type: ignore
+
+    id: Mapped[id_key] = mapped_column(init=False)
+    code: Mapped[str] = mapped_column(String(100), unique=True, index=True, comment="权限标识")
+    name: Mapped[str] = mapped_column(String(50), comment="权限名称")
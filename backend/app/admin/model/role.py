@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.common.model import Base, id_key
+
+
+class Role(Base):
+    """
+    角色表
+        - 用户通过 `sys_user_role` 关联角色，角色通过 `sys_role_permission` 关联权限
+        - 停用的角色不授予任何权限
+    """
+
+    __tablename__ = "sys_role"  # type: ignore
+
+    id: Mapped[id_key] = mapped_column(init=False)
+    name: Mapped[str] = mapped_column(String(20), unique=True, comment="角色名称")
+    status: Mapped[int] = mapped_column(default=1, comment="角色状态(0停用 1正常)")
+    remark: Mapped[str | None] = mapped_column(String(255), default=None, comment="备注")
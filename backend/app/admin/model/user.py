@@ -3,7 +3,7 @@
 from datetime import datetime
 
 from pydantic import HttpUrl
-from sqlalchemy import Boolean, DateTime, INTEGER, String, VARBINARY
+from sqlalchemy import Boolean, DateTime, INTEGER, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from backend.common.model import Base, id_key
@@ -62,9 +62,6 @@ class User(Base):
         default=False,
         comment="是否重复登陆(0否 1是)",
     )
-    salt: Mapped[bytes | None] = mapped_column(
-        VARBINARY(255), default=None, comment="加密盐"
-    )
     join_time: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         init=False,
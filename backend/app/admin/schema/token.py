@@ -2,9 +2,12 @@
 # -*- coding: utf-8 -*-
 from datetime import datetime
 
+from pydantic import Field
+
 from backend.app.admin.schema.user import UserInfoDetail
 from backend.common.enums import StatusEnum
 from backend.common.schema import SchemaBase
+from backend.core.config import settings
 
 
 class SwaggerToken(SchemaBase):
@@ -53,3 +56,39 @@ class LoginTokenDetail(SchemaBase):
     status: StatusEnum
     last_login_time: str
     expire_time: datetime
+
+
+class LoginTokenPage(SchemaBase):
+    """token 列表（游标分页）"""
+
+    items: list[LoginTokenDetail]
+    next_cursor: str | None = Field(
+        default=None,
+        description="下一页游标（当前页最后一个会话的 `过期时间戳:会话索引成员`），为空时没有更多数据",
+    )
+
+
+class TokenIntrospectParam(SchemaBase):
+    """批量校验 token"""
+
+    tokens: list[str] = Field(
+        description="Access Token 列表",
+        min_length=1,
+        max_length=settings.TOKEN_INTROSPECT_MAX_BATCH,
+    )
+
+
+class TokenIntrospectUser(SchemaBase):
+    """token 对应的最小用户信息"""
+
+    id: int
+    username: str | None
+    nickname: str | None
+    is_admin: bool
+
+
+class TokenIntrospectDetail(SchemaBase):
+    """token 校验结果"""
+
+    active: bool
+    user: TokenIntrospectUser | None = None
@@ -14,18 +14,21 @@ from backend.app.admin.schema.user import AuthPhoneByPassword
 from backend.common.enums import StatusEnum
 from backend.common.exception import errors
 from backend.common.logger import log
+from backend.common.request.context import get_request_context
 from backend.common.response.code import CustomErrorCode
 from backend.common.security.jwt import (
     create_access_token,
+    create_login_token,
     create_new_token,
-    create_refresh_token,
     get_token,
     jwt_decode,
-    password_verify,
+    jwt_decode_access,
+    password_verify_and_update,
+    revoke_token,
+    revoke_user_tokens,
 )
 from backend.core.config import settings
 from backend.database.mysql import async_db_session, uuid4_str
-from backend.database.redis import redis_client
 from backend.utils.timezone import timezone
 
 
@@ -49,8 +52,15 @@ class AuthService:
             raise errors.NotFoundError(msg="用户不存在")
         elif not user.status:
             raise errors.ForbiddenError(msg="用户已被禁用")
-        elif user.password and not password_verify(password, user.password):
-            raise errors.ForbiddenError(msg="密码错误")
+        elif user.password:
+            verified, updated_password = await password_verify_and_update(
+                password, user.password
+            )
+            if not verified:
+                raise errors.ForbiddenError(msg="密码错误")
+            # 哈希算法或成本已变更，登录成功后透明升级密码哈希值
+            if updated_password:
+                await user_crud.update_password(db, user.id, updated_password)
         # TODO 没有密码的用户验证, 引导设置密码等操作
         return user
 
@@ -84,7 +94,8 @@ class AuthService:
                 await user_crud.update_login_time(db, user.phone)
 
                 await db.refresh(user)
-                a_token = await create_access_token(
+                context = get_request_context(request)
+                a_token, r_token = await create_login_token(
                     user_id=str(user.id),
                     multi_login=user.is_multi_login,
                     # extra info
@@ -95,14 +106,10 @@ class AuthService:
                         if user.last_login_time
                         else timezone.now()
                     ),
-                    ip=request.state.ip,
-                    os=request.state.os,
-                    browser=request.state.browser,
-                    device=request.state.device,
-                )
-
-                r_token = await create_refresh_token(
-                    user_id=str(user.id), multi_login=user.is_multi_login
+                    ip=context.ip,
+                    os=context.os,
+                    browser=context.browser,
+                    device=context.device,
                 )
 
                 response.set_cookie(
@@ -150,6 +157,7 @@ class AuthService:
             if not user.status:
                 raise errors.ForbiddenError(msg="用户已被禁用")
 
+            context = get_request_context(request)
             n_token = await create_new_token(
                 user_id=str(user.id),
                 multi_login=user.is_multi_login,
@@ -163,10 +171,10 @@ class AuthService:
                     if user.last_login_time
                     else timezone.now()
                 ),
-                ip=request.state.ip,
-                os=request.state.os,
-                browser=request.state.browser,
-                device_type=request.state.device,
+                ip=context.ip,
+                os=context.os,
+                browser=context.browser,
+                device_type=context.device,
             )
 
             # 更新 refresh token
@@ -186,27 +194,22 @@ class AuthService:
 
     async def logout(self, *, request: Request, response: Response):
         token = get_token(request)
-        payload = jwt_decode(token)
+        payload = jwt_decode_access(token)
         user_id = payload.id
         refresh_token = request.cookies.get(settings.COOKIE_REFRESH_TOKEN_KEY)
 
         response.delete_cookie(settings.COOKIE_REFRESH_TOKEN_KEY)
 
         if request.user.is_multi_login:
-            await redis_client.delete(
-                f"{settings.TOKEN_REDIS_PREFIX}:{user_id}:{payload.session_uuid}"
-            )
+            refresh_jti = None
             if refresh_token:
-                await redis_client.delete(
-                    f"{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}:{refresh_token}"
-                )
+                try:
+                    refresh_jti = jwt_decode(refresh_token).jti
+                except errors.TokenError:
+                    pass  # Refresh Token 已失效，无需删除
+            await revoke_token(user_id, payload.session_uuid, refresh_jti)
         else:
-            key_prefix = [
-                f"{settings.TOKEN_REDIS_PREFIX}:{user_id}:",
-                f"{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}:",
-            ]
-            for prefix in key_prefix:
-                await redis_client.delete_prefix(prefix)
+            await revoke_user_tokens(user_id)
 
 
 auth_service: AuthService = AuthService()
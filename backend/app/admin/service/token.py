@@ -2,32 +2,98 @@
 # -*- coding: utf-8 -*-
 
 import json
-from typing import Annotated, Set
+from datetime import datetime
 
-from fastapi import Query, Request
-from backend.app.admin.schema.token import KickOutToken, LoginTokenDetail
+from fastapi import Request
+from backend.app.admin.crud.user import user_crud
+from backend.app.admin.schema.token import (
+    KickOutToken,
+    LoginTokenDetail,
+    LoginTokenPage,
+    TokenIntrospectDetail,
+    TokenIntrospectUser,
+)
 from backend.common.enums import StatusEnum
-from backend.common.security.jwt import admin_verify, jwt_decode
+from backend.common.exception import errors
+from backend.common.security.jwt import jwt_authentication_batch, revoke_token
+from backend.common.security.presence import session_presence
+from backend.common.security.session_event import session_event_hub
+from backend.database.mysql import async_db_session
 from backend.database.redis import redis_client
 from backend.core.config import settings
+from backend.utils.timezone import timezone
 
 
 class TokenService:
     @staticmethod
-    async def get_token_list(username: Annotated[str | None, Query()] = None):
-        token_keys = await redis_client.keys(f"{settings.TOKEN_REDIS_PREFIX}:*")
-        token_online: Set[str] = await redis_client.smembers(
-            settings.TOKEN_ONLINE_REDIS_PREFIX
-        )  # type: ignore
+    async def get_token_list(
+        *, username: str | None = None, cursor: str | None = None, size: int = 20
+    ) -> LoginTokenPage:
+        """
+        按过期时间从会话索引中分页获取 token 列表
 
-        data = []
+        :param username: 用户名，指定时使用该用户的会话索引
+        :param cursor: 游标，上一页返回的 `next_cursor`（`过期时间戳:会话索引成员`）
+        :param size: 每页数量
+        :return:
+        """
+        if username:
+            async with async_db_session() as db:
+                user = await user_crud.get_by_username(db, username)
+            if not user:
+                return LoginTokenPage(items=[])
+            index = f"{settings.TOKEN_SESSION_REDIS_PREFIX}:{user.id}"
+            member_prefix = f"{user.id}:"
+        else:
+            index = settings.TOKEN_SESSION_INDEX_REDIS_KEY
+            member_prefix = ""
+
+        # 索引分数为过期时间戳（精确到微秒），以分数和成员作为游标，跳过已过期的会话
+        # 分数相同的成员按字典序排列，游标分数仍未过期时从该分数开始，跳过分数相同且不大于游标成员的会话
+        now = timezone.now().timestamp()
+        min_score, offset = f"({now}", 0
+        if cursor:
+            try:
+                cursor_score, cursor_member = cursor.split(":", 1)
+                score = float(cursor_score)
+            except ValueError:
+                raise errors.RequestError(msg="游标无效")
+            if score >= now:
+                ties = await redis_client.zrangebyscore(index, score, score)
+                min_score, offset = score, sum(1 for tie in ties if tie <= cursor_member)
+        members = await redis_client.zrangebyscore(
+            index, min_score, "+inf", start=offset, num=size, withscores=True
+        )
+        if not members:
+            return LoginTokenPage(items=[])
 
-        for key in token_keys:
-            token = await redis_client.get(key)
-            payload = jwt_decode(token)
-            session_uuid = payload.session_uuid
+        sessions = []
+        for member, score in members:
+            user_id, session_uuid = f"{member_prefix}{member}".split(":", 1)
+            sessions.append((int(user_id), session_uuid, score))
+
+        # 一次往返批量获取附加信息和在线状态
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.mget(
+                [
+                    f"{settings.TOKEN_EXTRA_INFO_REDIS_PREFIX}:{user_id}:{session_uuid}"
+                    for user_id, session_uuid, _ in sessions
+                ]
+            )
+            pipe.zmscore(
+                settings.TOKEN_ONLINE_REDIS_PREFIX,
+                [session_uuid for _, session_uuid, _ in sessions],
+            )
+            extra_infos, last_seens = await pipe.execute()
+
+        online_since = session_presence.online_since()
+
+        data = []
+        for (user_id, session_uuid, score), extra_info, last_seen in zip(
+            sessions, extra_infos, last_seens
+        ):
             token_detail = LoginTokenDetail(
-                id=payload.id,
+                id=user_id,
                 session_uuid=session_uuid,
                 username="未知",
                 nickname="未知",
@@ -36,52 +102,70 @@ class TokenService:
                 browser="未知",
                 device="未知",
                 status=(
-                    StatusEnum.NO
-                    if session_uuid not in token_online
-                    else StatusEnum.YES
+                    StatusEnum.YES
+                    if last_seen is not None and last_seen >= online_since
+                    else StatusEnum.NO
                 ),
                 last_login_time="未知",
-                expire_time=payload.expire_time,
-            )
-            extra_info = await redis_client.get(
-                f"{settings.TOKEN_EXTRA_INFO_REDIS_PREFIX}:{session_uuid}"
+                expire_time=datetime.fromtimestamp(score, timezone.tz_info),
             )
             if extra_info:
-
-                def append_token_detail():
-                    data.append(
-                        token_detail.model_copy(
-                            update={
-                                "username": extra_info.get("username"),
-                                "nickname": extra_info.get("nickname"),
-                                "ip": extra_info.get("ip"),
-                                "os": extra_info.get("os"),
-                                "browser": extra_info.get("browser"),
-                                "device": extra_info.get("device"),
-                                "last_login_time": extra_info.get("last_login_time"),
-                            }
+                extra_info = json.loads(extra_info)
+                if extra_info.get("login_type") == "swagger":
+                    continue
+                token_detail = token_detail.model_copy(
+                    update={
+                        key: extra_info[key]
+                        for key in (
+                            "username",
+                            "nickname",
+                            "ip",
+                            "os",
+                            "browser",
+                            "device",
+                            "last_login_time",
                         )
-                    )
+                        if extra_info.get(key) is not None
+                    }
+                )
+            data.append(token_detail)
 
-                extra_info = json.loads(extra_info)
-                if extra_info.get("login_type") != "swagger":
-                    if not username or username == extra_info.get("username"):
-                        append_token_detail()
-            else:
-                data.append(token_detail)
+        # 不足一页说明没有更多数据
+        next_cursor = f"{members[-1][1]}:{members[-1][0]}" if len(members) == size else None
+        return LoginTokenPage(items=data, next_cursor=next_cursor)
+
+    @staticmethod
+    async def get_online_sessions() -> list[str]:
+        """获取在线会话，一次范围查询"""
+        return await session_presence.online_sessions()
+
+    @staticmethod
+    async def introspect(tokens: list[str]) -> list[TokenIntrospectDetail]:
+        """
+        批量校验 token，供内部服务（如网关）使用
 
-            return data
+        :param tokens: Access Token 列表
+        :return: 与 tokens 一一对应的校验结果
+        """
+        users = await jwt_authentication_batch(tokens)
+        data = []
+        for user in users:
+            if user is None:
+                data.append(TokenIntrospectDetail(active=False))
+                continue
+            data.append(
+                TokenIntrospectDetail(
+                    active=True,
+                    user=TokenIntrospectUser.model_validate(user, from_attributes=True),
+                )
+            )
+        return data
 
     @staticmethod
     async def kick_out(request: Request, user_id: int, KickOutToken: KickOutToken):
-        admin_verify(request)
         # 删除 当前会话 token
-        await redis_client.delete(
-            f"{settings.TOKEN_REDIS_PREFIX}:{user_id}:{KickOutToken.session_uuid}"
-        )
-        await redis_client.delete(
-            f"{settings.TOKEN_EXTRA_INFO_REDIS_PREFIX}:{user_id}:{KickOutToken.session_uuid}"
-        )
+        await revoke_token(user_id, KickOutToken.session_uuid)
+        await session_event_hub.publish("kick_out", user_id, [KickOutToken.session_uuid])
 
 
 token_service = TokenService()
@@ -5,9 +5,10 @@ from backend.app.admin.crud.user import user_crud
 from backend.app.admin.model import User
 from backend.app.admin.schema.user import RegisterUser, UpdateUser
 from backend.common.exception import errors
-from backend.core.config import settings
+from backend.common.security.jwt import revoke_user_tokens
+from backend.common.security.session_event import session_event_hub
+from backend.common.security.user_cache import invalidate_user_cache
 from backend.database.mysql import async_db_session
-from backend.database.redis import redis_client
 
 
 class UserService:
@@ -28,13 +29,11 @@ class UserService:
             if not user:
                 raise errors.NotFoundError(msg="用户不存在")
             count = await user_crud.delete(db, user.id)
-            key_prefix = [
-                f"{settings.TOKEN_REDIS_PREFIX}:{user.id}",
-                f"{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user.id}",
-            ]
-            for key in key_prefix:
-                await redis_client.delete_prefix(key)
-            return count
+            await revoke_user_tokens(user.id)
+        # 事务提交后再清除缓存，避免并发请求重新缓存旧数据
+        await invalidate_user_cache(id)
+        await session_event_hub.publish("revoked", id)
+        return count
 
     @staticmethod
     async def update(*, id: int, obj: UpdateUser) -> int:
@@ -50,7 +49,8 @@ class UserService:
             # verify
 
             count = await user_crud.update_user_info(db, id, obj)
-            return count
+        await invalidate_user_cache(id)
+        return count
 
     @staticmethod
     async def get(*, id: int) -> User:
@@ -70,3 +70,4 @@ class TokenPayload:
     id: int
     session_uuid: str
     expire_time: datetime
+    jti: str | None = None  # Refresh Token 唯一标识
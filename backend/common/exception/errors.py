@@ -183,6 +183,21 @@ class GatewayError(BaseExceptionMixin):
         super().__init__(msg=msg, data=data, background=background)
 
 
+class ServiceUnavailableError(BaseExceptionMixin):
+    """服务不可用异常：503（Service Unavailable）"""
+
+    code = StandardResponseCode.HTTP_503
+
+    def __init__(
+        self,
+        *,
+        msg: str = CustomResponseCode.HTTP_503.msg,
+        data: Any = None,
+        background: BackgroundTask | None = None
+    ):
+        super().__init__(msg=msg, data=data, background=background)
+
+
 # ========== 特殊 HTTP 异常 ==========
 class TokenError(HTTPError):
     """认证失败异常：401（Not Authenticated）"""
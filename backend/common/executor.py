@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Literal, TypeVar
+
+from backend.common.exception.errors import ServiceUnavailableError
+
+T = TypeVar("T")
+
+# 已注册的有界执行器，用于统一查看排队、耗时等指标
+bounded_executors: dict[str, "BoundedExecutor"] = {}
+
+
+def _timed_call(func: Callable[..., T], *args: Any) -> tuple[T, float, float]:
+    """在工作线程 / 进程中执行任务，并记录开始、结束时间（monotonic 为系统级时钟，可跨进程比较）"""
+    start = time.monotonic()
+    result = func(*args)
+    return result, start, time.monotonic()
+
+
+class BoundedExecutor:
+    """
+    有界执行器：将阻塞的 CPU 任务（如密码哈希）放到线程池 / 进程池执行，避免阻塞事件循环
+        - 进行中 + 排队的任务数超过 `max_workers + max_queue` 时直接拒绝，返回 503
+        - 记录排队等待时间和执行时间
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        kind: Literal["thread", "process"],
+        max_workers: int,
+        max_queue: int,
+    ):
+        """
+        :param name: 执行器名称，用于指标展示
+        :param kind: 执行器类型，`thread` 线程池，`process` 进程池
+        :param max_workers: 最大并发数
+        :param max_queue: 最大排队数
+        """
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Executor | None = None
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+        self._run_total = 0.0
+        self._run_max = 0.0
+        bounded_executors[name] = self
+
+    def _get_executor(self) -> Executor:
+        # 延迟创建，避免在导入阶段（如 uvicorn 多进程 fork 之前）创建线程 / 进程
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        在执行器中运行任务
+
+        :param func: 任务函数，使用进程池时必须可被 pickle（模块级函数）
+        :param args: 任务参数
+        :return: 任务返回值
+        """
+        if self._pending >= self.max_workers + self.max_queue:
+            self._rejected += 1
+            raise ServiceUnavailableError(msg="服务繁忙，请稍后重试")
+
+        self._pending += 1
+        submitted = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            result, start, end = await loop.run_in_executor(
+                self._get_executor(), _timed_call, func, *args
+            )
+        finally:
+            self._pending -= 1
+
+        queue_wait, run_time = start - submitted, end - start
+        self._completed += 1
+        self._queue_wait_total += queue_wait
+        self._queue_wait_max = max(self._queue_wait_max, queue_wait)
+        self._run_total += run_time
+        self._run_max = max(self._run_max, run_time)
+        return result
+
+    def shutdown(self) -> None:
+        """关闭执行器"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict[str, Any]:
+        """执行器指标，时间单位：毫秒"""
+        completed = self._completed or 1
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "queue_wait_avg_ms": round(self._queue_wait_total / completed * 1000, 3),
+            "queue_wait_max_ms": round(self._queue_wait_max * 1000, 3),
+            "run_avg_ms": round(self._run_total / completed * 1000, 3),
+            "run_max_ms": round(self._run_max * 1000, 3),
+        }
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from fastapi import Request
+from starlette.types import Scope
+
+from backend.common.dataclasses import IpInfo, UserAgentInfo
+from backend.common.request.parse import get_request_ip, parse_ip_info, parse_user_agent_info
+
+
+class RequestContext:
+    """
+    请求上下文，由 `StateMiddleware` 写入 `request.state.context`
+        - 各字段在首次读取时才解析并缓存，未读取的字段没有开销
+        - IP 属地需要查询 Redis / 离线库 / 在线接口，通过 `await context.ip_info()` 获取
+    """
+
+    __slots__ = ("_scope", "_ip", "_ip_info", "_user_agent_info")
+
+    def __init__(self, scope: Scope):
+        """
+        :param scope: ASGI 连接信息
+        """
+        self._scope = scope
+        self._ip: str | None = None
+        self._ip_info: IpInfo | None = None
+        self._user_agent_info: UserAgentInfo | None = None
+
+    @property
+    def ip(self) -> str:
+        """客户端 IP 地址，仅读取请求头"""
+        if self._ip is None:
+            self._ip = get_request_ip(Request(self._scope))
+        return self._ip
+
+    async def ip_info(self) -> IpInfo:
+        """IP 地址及属地"""
+        if self._ip_info is None:
+            self._ip_info = await parse_ip_info(Request(self._scope))
+        return self._ip_info
+
+    @property
+    def user_agent_info(self) -> UserAgentInfo:
+        """User-Agent 解析结果"""
+        if self._user_agent_info is None:
+            self._user_agent_info = parse_user_agent_info(Request(self._scope))
+        return self._user_agent_info
+
+    @property
+    def user_agent(self) -> str:
+        return self.user_agent_info.user_agent
+
+    @property
+    def os(self) -> str | None:
+        return self.user_agent_info.os
+
+    @property
+    def os_version(self) -> str | None:
+        return self.user_agent_info.os_version
+
+    @property
+    def browser(self) -> str | None:
+        return self.user_agent_info.browser
+
+    @property
+    def browser_version(self) -> str | None:
+        return self.user_agent_info.browser_version
+
+    @property
+    def device(self) -> str | None:
+        return self.user_agent_info.device
+
+    @property
+    def device_model(self) -> str | None:
+        return self.user_agent_info.device_model
+
+
+def get_request_context(request: Request) -> RequestContext:
+    """获取请求上下文，未经过 `StateMiddleware` 的请求（如测试）按需创建"""
+    context = getattr(request.state, "context", None)
+    if context is None:
+        context = request.state.context = RequestContext(request.scope)
+    return context
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import json
+from typing import Iterable
+
 import httpx
-from XdbSearchIP.xdbSearcher import XdbSearcher
-from asgiref.sync import sync_to_async
 from fastapi import Request
 from user_agents import parse
 
@@ -11,6 +12,8 @@ from backend.common.logger import log
 from backend.core.config import settings
 from backend.core.paths import Ip2RegionPath
 from backend.database.redis import redis_client
+from backend.utils.cache import LocalCache
+from backend.utils.ip2region import ip2region
 
 
 def get_request_ip(request: Request) -> str:
@@ -44,59 +47,161 @@ async def get_location_online(ip: str, user_agent: str) -> dict | None:
             return None
 
 
-@sync_to_async
-def get_location_offline(ip: str) -> dict | None:
-    """离线获取 ip 地址属地，无法保证准确率，100%可用"""
+def search_ip_segment(ip: str) -> tuple[int, int, str] | None:
+    """
+    查询 ip 地址在离线库中所在的地址段
+
+    :param ip: ip 地址
+    :return: (起始 IP, 结束 IP, 属地信息)，离线库不可用、非 IPv4 地址或未找到时返回 None
+    """
     try:
-        cb = XdbSearcher.loadContentFromFile(dbfile=Ip2RegionPath)
-        searcher = XdbSearcher(contentBuff=cb)
-        data = searcher.search(ip)
-        searcher.close()
-        data = data.split("|")
-        return {
-            "country": data[0] if data[0] != "0" else None,
-            "regionName": data[2] if data[2] != "0" else None,
-            "city": data[3] if data[3] != "0" else None,
-        }
+        # 正常情况下已在应用启动时加载，此处兼容未经过 lifespan 的调用（如脚本）
+        if not ip2region.loaded:
+            ip2region.open(Ip2RegionPath)
     except Exception as e:
         log.error(f"离线获取 ip 地址属地失败，错误信息：{e}")
         return None
+    try:
+        return ip2region.search_segment(ip)
+    except OSError:
+        return None  # 非 IPv4 地址
+
+
+def get_location_offline(ip: str) -> dict | None:
+    """离线获取 ip 地址属地，无法保证准确率，100%可用"""
+    segment = search_ip_segment(ip)
+    if segment is None:
+        return None
+    return _parse_region(segment[2])
+
+
+def _parse_region(region: str) -> dict:
+    """解析离线库属地信息：国家|区域|省份|城市|ISP"""
+    data = region.split("|")
+    return {
+        "country": data[0] if data[0] != "0" else None,
+        "regionName": data[2] if data[2] != "0" else None,
+        "city": data[3] if data[3] != "0" else None,
+    }
+
+
+# ip 地址属地的进程内缓存，key 为 `block:地址段起始 IP`（不在离线库中的地址为 `ip:地址`），value 为 (国家, 省份, 城市)
+# Redis 缓存使用相同的 key 后缀，与旧版本按 ip 存储的 key（`前缀:地址`）不冲突
+ip_location_cache: LocalCache[str, tuple[str | None, str | None, str | None]] = LocalCache(
+    "ip_location",
+    maxsize=settings.IP_LOCATION_CACHE_MAXSIZE,
+    ttl=settings.IP_LOCATION_EXPIRE_SECONDS,
+)
 
 
 async def parse_ip_info(request: Request) -> IpInfo:
-    country, region, city = None, None, None
+    """
+    解析请求的 ip 地址及属地
+        - 缓存按离线库地址段聚合，同一网段的地址共用一条缓存
+        - 进程内缓存 -> 离线库（offline）/ Redis -> 在线接口（online）
+    """
     ip = get_request_ip(request)
-    location = await redis_client.get(f"{settings.IP_LOCATION_REDIS_PREFIX}:{ip}")
-    if location:
-        country, region, city = location.split(" ")
-        return IpInfo(ip=ip, country=country, region=region, city=city)
-    if settings.IP_LOCATION_PARSE == "online":
+    if settings.IP_LOCATION_PARSE == "false":
+        return IpInfo(ip=ip)
+
+    segment = search_ip_segment(ip)
+    block = f"block:{segment[0]}" if segment is not None else f"ip:{ip}"
+    location = ip_location_cache.get(block)
+    if location is None:
+        location = await _get_location(request, ip, block, segment)
+    country, region, city = location
+    return IpInfo(ip=ip, country=country, region=region, city=city)
+
+
+async def _get_location(
+    request: Request, ip: str, block: str, segment: tuple[int, int, str] | None
+) -> tuple[str | None, str | None, str | None]:
+    """获取地址段属地并写入进程内缓存"""
+    if settings.IP_LOCATION_PARSE == "offline":
+        # 离线库已映射到内存，查询耗时为微秒级，不需要 Redis 缓存
+        location_info = _parse_region(segment[2]) if segment is not None else None
+    else:
+        cache_location = await redis_client.get(f"{settings.IP_LOCATION_REDIS_PREFIX}:{block}")
+        if cache_location:
+            try:
+                location = tuple(json.loads(cache_location))
+            except ValueError:
+                location = None  # 无法解析的缓存视为未命中，重新查询后覆盖
+            if location is not None and len(location) == 3:
+                ip_location_cache.set(block, location)
+                return location
         location_info = await get_location_online(
             ip, request.headers.get("User-Agent", "unknown user agent")
         )
-    elif settings.IP_LOCATION_PARSE == "offline":
-        location_info = await get_location_offline(ip)
-    else:
-        location_info = None
-    if location_info:
-        country = location_info.get("country")
-        region = location_info.get("regionName")
-        city = location_info.get("city")
+
+    if not location_info:
+        # 查询失败时短暂缓存空结果，避免每个请求都重试在线接口
+        location = (None, None, None)
+        ip_location_cache.set(block, location, ttl=60)
+        return location
+
+    location = (
+        location_info.get("country"),
+        location_info.get("regionName"),
+        location_info.get("city"),
+    )
+    if settings.IP_LOCATION_PARSE == "online":
         await redis_client.set(
-            f"{settings.IP_LOCATION_REDIS_PREFIX}:{ip}",
-            f"{country} {region} {city}",
+            f"{settings.IP_LOCATION_REDIS_PREFIX}:{block}",
+            json.dumps(location, ensure_ascii=False),
             ex=settings.IP_LOCATION_EXPIRE_SECONDS,
         )
-    return IpInfo(ip=ip, country=country, region=region, city=city)
+    ip_location_cache.set(block, location)
+    return location
+
+
+# User-Agent 解析结果的进程内缓存（key 为原始 User-Agent），实际流量中不同的 User-Agent 数量有限
+user_agent_cache: LocalCache[str, UserAgentInfo] = LocalCache(
+    "user_agent", maxsize=settings.USER_AGENT_CACHE_MAXSIZE
+)
 
 
 def parse_user_agent_info(request: Request) -> UserAgentInfo:
+    """解析请求的 User-Agent，结果为共享缓存，不要修改"""
     user_agent = request.headers.get("User-Agent", "").strip()
 
     # 如果 User-Agent 为空，直接返回默认的 UserAgentInfo 对象
     if not user_agent:
         return UserAgentInfo(user_agent="unknown")
 
+    ua_info = user_agent_cache.get(user_agent)
+    if ua_info is None:
+        ua_info = parse_user_agent(user_agent)
+        user_agent_cache.set(user_agent, ua_info)
+    return ua_info
+
+
+def parse_user_agents(user_agents: Iterable[str | None]) -> list[UserAgentInfo]:
+    """
+    批量解析 User-Agent，用于离线处理已存储的数据（如登录日志）
+        - 相同的 User-Agent 只解析一次
+        - 只读取进程内缓存，不写入，避免挤出请求中的热点条目
+
+    :param user_agents: 原始 User-Agent 列表
+    :return: 与 user_agents 一一对应的解析结果
+    """
+    parsed: dict[str, UserAgentInfo] = {}
+    data = []
+    for user_agent in user_agents:
+        user_agent = (user_agent or "").strip()
+        ua_info = parsed.get(user_agent)
+        if ua_info is None:
+            if not user_agent:
+                ua_info = UserAgentInfo(user_agent="unknown")
+            else:
+                ua_info = user_agent_cache.peek(user_agent) or parse_user_agent(user_agent)
+            parsed[user_agent] = ua_info
+        data.append(ua_info)
+    return data
+
+
+def parse_user_agent(user_agent: str) -> UserAgentInfo:
+    """解析 User-Agent 字符串"""
     _user_agent = parse(user_agent)
 
     # 获取操作系统及版本
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import secrets
+from typing import Annotated
+
+from fastapi import Depends, Header
+
+from backend.common.exception.errors import ForbiddenError
+from backend.core.config import settings
+
+
+async def internal_auth(
+    x_internal_secret: Annotated[str | None, Header(description="内部服务密钥")] = None,
+) -> None:
+    """
+    内部服务认证：校验请求头 `X-Internal-Secret`，未配置密钥时拒绝所有请求
+
+    :param x_internal_secret: 内部服务密钥
+    :return:
+    """
+    secret = settings.TOKEN_INTROSPECT_SECRET
+    if not secret or not x_internal_secret:
+        raise ForbiddenError(msg="禁止访问")
+    if not secrets.compare_digest(x_internal_secret.encode(), secret.encode()):
+        raise ForbiddenError(msg="禁止访问")
+
+
+# 内部服务认证依赖注入
+DependsInternalAuth = Depends(internal_auth)
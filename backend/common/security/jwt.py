@@ -1,64 +1,235 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import asyncio
+import hashlib
 import json
-from datetime import timedelta
+import math
+import random
+import secrets
+import time
+from datetime import datetime, timedelta
+from typing import Annotated, Any, Coroutine
 from uuid import uuid4
 
 from fastapi import Depends, Request
-from fastapi.security import HTTPBearer
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from fastapi.security.utils import get_authorization_scheme_param
 
 # JWT 相关库
 from jose import ExpiredSignatureError, JWTError, jwt
 
-# 密码加密验证库
-from pwdlib import PasswordHash
-from pwdlib.hashers.bcrypt import BcryptHasher
-
 # Pydantic 数据解析
 from pydantic_core import from_json
+from redis.commands.core import AsyncScript
 
 # 异步数据库会话
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.authentication import AuthCredentials
 
 from backend.app.admin.model import User
 from backend.app.admin.schema.user import UserInfoDetail
 from backend.common.dataclasses import AccessToken, NewToken, RefreshToken, TokenPayload
-from backend.common.exception.errors import AuthorizationError, TokenError
+from backend.common.exception.errors import AuthorizationError, ServerError, TokenError
+from backend.common.logger import log
+from backend.common.security.password import (
+    hash_password,
+    password_executor,
+    verify_and_update_password,
+)
+from backend.common.security.presence import session_presence
+from backend.common.security.revocation import session_revocation
+from backend.common.security.session_event import session_event_hub
+from backend.common.security.user_cache import (
+    get_invalidate_count,
+    get_user_cache_version,
+    set_local_cache,
+    set_user_cache,
+    user_info_cache,
+)
 from backend.core.config import settings
 from backend.database.mysql import async_db_session
 from backend.database.redis import redis_client
+from backend.utils.cache import LocalCache, SingleFlight
+from backend.utils.path_matcher import PathMatcher
 from backend.utils.serializers import select_as_dict
 from backend.utils.timezone import timezone
 
-# JWT 认证依赖注入（自动解析请求头中 `Depends(DependsJwtAuth)` 的 Bearer Token）
-DependsJwtAuth = Depends(HTTPBearer())
-
-# 密码哈希实例初始化（使用 Bcrypt 算法），多个哈希器可共存，此处只使用 Bcrypt
-password_hash = PasswordHash((BcryptHasher(),))
-
-
-def get_hash_password(password: str, salt: bytes | None) -> str:
-    """使用哈希算法加密密码（含盐值），生成格式如 "bcrypt$..." 的哈希字符串"""
-    return password_hash.hash(password, salt=salt)
-
-
-def password_verify(plain_password: str, hashed_password: str) -> bool:
-    """自动解析算法并验证，验证明文密码与哈希值是否匹配"""
-    return password_hash.verify(plain_password, hashed_password)
+# 以下脚本访问的 key 均通过 KEYS 传入，但同一用户的 key 不在同一哈希槽，仅支持单机（或主从 / 哨兵）Redis，不支持 Redis Cluster
+#
+# 单设备登录时，待吊销的会话和 Refresh Token 由调用方预先读取，对应的 key 追加在 KEYS 末尾，
+# 脚本先校验索引与读取结果一致（乐观锁），不一致时不做任何修改并返回 -1，由调用方重新读取后重试
+# 追加的 KEYS（从第 vk 个开始）: 每个旧会话的 Token, 附加信息; 每个旧 Refresh Token
+# 追加的 ARGV（从第 va 个开始）: 旧会话数量, 旧会话 ID..., 旧 Refresh Token 数量, 旧 Refresh Token jti...
+_ISSUE_TOKEN_CHECK_LUA = """
+if ARGV[1] == '0' then
+    local n = tonumber(ARGV[va])
+    local sessions = redis.call('ZRANGE', KEYS[1], 0, -1)
+    if #sessions ~= n then
+        return -1
+    end
+    for i, sid in ipairs(sessions) do
+        if sid ~= ARGV[va + i] then
+            return -1
+        end
+    end
+    if ARGV[7] ~= '' then
+        local m = tonumber(ARGV[va + n + 1])
+        local jtis = redis.call('ZRANGE', KEYS[4], 0, -1)
+        if #jtis ~= m then
+            return -1
+        end
+        for i, rid in ipairs(jtis) do
+            if rid ~= ARGV[va + n + 1 + i] then
+                return -1
+            end
+        end
+    end
+end
+"""
+
+# 签发 Token：多设备登录控制、存储 Token / 附加信息 / Refresh Token、维护会话索引，返回被吊销的会话 ID
+# KEYS: 会话索引, Token, 附加信息, Refresh Token 索引, Refresh Token, 全局会话索引
+# ARGV: 是否多设备登录, 会话 ID, Token, Token 过期秒数, Token 过期时间戳, 附加信息, Refresh Token jti（为空时不签发）,
+#       Refresh Token 值, Refresh Token 过期秒数, Refresh Token 过期时间戳, 当前时间戳, 全局会话索引成员前缀
+_ISSUE_TOKEN_BODY_LUA = """
+local revoked = {}
+if ARGV[1] == '0' then
+    local n = tonumber(ARGV[va])
+    for i = 1, n do
+        revoked[i] = ARGV[va + i]
+        redis.call('DEL', KEYS[vk + 2 * i - 2], KEYS[vk + 2 * i - 1])
+        redis.call('ZREM', KEYS[6], ARGV[12] .. revoked[i])
+    end
+    redis.call('DEL', KEYS[1])
+    if ARGV[7] ~= '' then
+        local m = tonumber(ARGV[va + n + 1])
+        for i = 1, m do
+            redis.call('DEL', KEYS[vk + 2 * n + i - 1])
+        end
+        redis.call('DEL', KEYS[4])
+    end
+end
+redis.call('SET', KEYS[2], ARGV[3], 'EX', ARGV[4])
+if ARGV[6] ~= '' then
+    redis.call('SET', KEYS[3], ARGV[6], 'EX', ARGV[4])
+end
+redis.call('ZADD', KEYS[1], ARGV[5], ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[11])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('ZADD', KEYS[6], ARGV[5], ARGV[12] .. ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[6], '-inf', ARGV[11])
+if ARGV[7] ~= '' then
+    redis.call('SET', KEYS[5], ARGV[8], 'EX', ARGV[9])
+    redis.call('ZADD', KEYS[4], ARGV[10], ARGV[7])
+    redis.call('ZREMRANGEBYSCORE', KEYS[4], '-inf', ARGV[11])
+    redis.call('EXPIRE', KEYS[4], ARGV[9])
+end
+return revoked
+"""
+
+_ISSUE_TOKEN_LUA = "local vk, va = 7, 13\n" + _ISSUE_TOKEN_CHECK_LUA + _ISSUE_TOKEN_BODY_LUA
+
+# 刷新 Token：校验旧 Refresh Token，吊销旧会话后按签发脚本签发新 Token，校验失败返回 nil
+# KEYS / ARGV 在签发脚本基础上追加（位于单设备登录追加参数之前）
+# KEYS: 旧 Refresh Token, 旧 Token, 旧附加信息
+# ARGV: 旧会话 ID, 旧 Refresh Token jti
+_ROTATE_TOKEN_LUA = (
+    "local vk, va = 10, 15\n"
+    + _ISSUE_TOKEN_CHECK_LUA
+    + """
+if redis.call('EXISTS', KEYS[7]) == 0 then
+    return false
+end
+redis.call('DEL', KEYS[7], KEYS[8], KEYS[9])
+redis.call('ZREM', KEYS[1], ARGV[13])
+redis.call('ZREM', KEYS[4], ARGV[14])
+redis.call('ZREM', KEYS[6], ARGV[12] .. ARGV[13])
+"""
+    + _ISSUE_TOKEN_BODY_LUA
+)
+
+# 单设备登录时并发签发导致乐观锁校验失败的最大重试次数
+_ISSUE_TOKEN_RETRIES = 10
+
+# 续期 Token：会话仍存在时延长 Token / 附加信息 / 会话索引的有效期，并更新索引中的过期时间，会话不存在返回 0
+# KEYS: 会话索引, Token, 附加信息, 全局会话索引
+# ARGV: 会话 ID, Token 过期秒数, Token 过期时间戳, 全局会话索引成员
+_EXTEND_TOKEN_LUA = """
+if redis.call('EXPIRE', KEYS[2], ARGV[2]) == 0 then
+    return 0
+end
+redis.call('EXPIRE', KEYS[3], ARGV[2])
+redis.call('ZADD', KEYS[1], 'XX', ARGV[3], ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('ZADD', KEYS[4], 'XX', ARGV[3], ARGV[4])
+return 1
+"""
+
+_issue_token_script = redis_client.register_script(_ISSUE_TOKEN_LUA)
+_rotate_token_script = redis_client.register_script(_ROTATE_TOKEN_LUA)
+_extend_token_script = redis_client.register_script(_EXTEND_TOKEN_LUA)
+
+# 滑动过期依赖 Redis 会话，无状态校验模式下不生效
+_sliding_expire = settings.TOKEN_SLIDING_EXPIRE and not settings.TOKEN_STATELESS_VERIFY
+
+# 本周期内已续期的会话，过期后可再次续期
+session_extend_cache: LocalCache[str, bool] = LocalCache(
+    "session_extend",
+    maxsize=settings.TOKEN_PAYLOAD_CACHE_MAXSIZE,
+    ttl=settings.TOKEN_SLIDING_INTERVAL_SECONDS,
+)
+
+# 后台任务引用，避免任务在完成前被垃圾回收
+_background_tasks: set[asyncio.Task] = set()
+
+# 用户信息加载：合并同一用户的并发数据库查询
+_user_loader: SingleFlight[int, UserInfoDetail] = SingleFlight()
+# 最近一次从数据库加载用户信息的耗时，单位：秒，用于提前刷新
+_user_load_seconds = 0.05
+
+# 已验证 token 载荷的进程内缓存（key 为 token 摘要），条目在 token 过期时淘汰
+token_payload_cache: LocalCache[bytes, TokenPayload] = LocalCache(
+    "token_payload", maxsize=settings.TOKEN_PAYLOAD_CACHE_MAXSIZE
+)
+
+# token 载荷缓存的会话索引：user_id -> session_uuid -> token 摘要，吊销会话时只处理该用户的条目，无需遍历缓存
+_token_payload_index: dict[int, dict[str, set[bytes]]] = {}
+_token_payload_index_size = 0
+
+# 最近被拒绝的 token 的进程内缓存（key 为 token 摘要，value 为错误信息），重复请求直接拒绝
+rejected_token_cache: LocalCache[bytes, str] = LocalCache(
+    "rejected_token",
+    maxsize=settings.TOKEN_REJECTED_CACHE_MAXSIZE,
+    ttl=settings.TOKEN_REJECTED_CACHE_SECONDS,
+)
+
+
+async def get_hash_password(password: str) -> str:
+    """使用当前配置的哈希算法加密密码（含随机盐值），生成格式如 "$2b$..." 的哈希字符串，在密码执行器中执行"""
+    return await password_executor.run(hash_password, password)
+
+
+async def password_verify_and_update(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """验证密码，旧算法或旧成本的哈希值验证通过时同时返回升级后的哈希值，在密码执行器中执行"""
+    return await password_executor.run(
+        verify_and_update_password, plain_password, hashed_password
+    )
 
 
-async def create_access_token(user_id: str, multi_login: bool, **kwargs) -> AccessToken:
+def _encode_access_token(user_id: str) -> tuple[str, str, datetime]:
     """
-    生成加密的 Access Token
+    JWT 编码 Access Token
 
     :param user_id: 用户唯一标识
-    :param multi_login: 是否允许多设备登录
-    :param kwargs: 附加信息（如权限数据）
-    :return: AccessToken 对象
+    :return: (access token, 会话 ID, 过期时间)
     """
-    # 计算过期时间（当前时间 + 配置中的有效期）
-    expire = timezone.now() + timedelta(seconds=settings.TOKEN_EXPIRE_SECONDS)
+    # 计算过期时间（当前时间 + 配置中的有效期），滑动过期模式下为最长有效期，空闲过期由 Redis 会话控制
+    expire_seconds = (
+        settings.TOKEN_SLIDING_MAX_SECONDS if _sliding_expire else settings.TOKEN_EXPIRE_SECONDS
+    )
+    expire = timezone.now() + timedelta(seconds=expire_seconds)
 
     # 生成唯一会话 ID（用于控制多设备登录）
     session_uuid = str(uuid4())  # 示例：d7d1a8c0-8a3d-4f5e-9f6a-1c7b8d9e0f1a
@@ -73,31 +244,138 @@ async def create_access_token(user_id: str, multi_login: bool, **kwargs) -> Acce
         settings.TOKEN_SECRET_KEY,  # 密钥（从配置读取）
         settings.TOKEN_ALGORITHM,  # 加密算法（如 HS256）
     )
+    return access_token, session_uuid, expire
 
-    # 多设备登录控制逻辑
-    if multi_login is False:
-        # 删除该用户所有旧 Token（格式示例：TOKEN_REDIS_PREFIX:1）
-        await redis_client.delete_prefix(f"{settings.TOKEN_REDIS_PREFIX}:{user_id}")
-        await redis_client.delete_prefix(
-            f"{settings.TOKEN_EXTRA_INFO_REDIS_PREFIX}:{user_id}"
-        )
 
-    # 存储 Token 到 Redis
-    await redis_client.setex(
+def _encode_refresh_token(user_id: str) -> tuple[str, str, datetime]:
+    """
+    JWT 编码 Refresh Token（仅用于刷新 Access Token）
+
+    :param user_id: 用户唯一标识
+    :return: (refresh token, jti, 过期时间)
+    """
+    # 计算过期时间（通常比 Access Token 长，一般是8 天）
+    expire = timezone.now() + timedelta(seconds=settings.TOKEN_REFRESH_EXPIRE_SECONDS)
+
+    # 短唯一标识，Redis 中以 jti 代替完整 Token 作为 key
+    jti = secrets.token_urlsafe(12)
+
+    # JWT 编码（包含用户 ID、jti 和过期时间）
+    refresh_token = jwt.encode(
+        {"exp": expire, "sub": user_id, "jti": jti},  # Payload
+        settings.TOKEN_SECRET_KEY,  # 密钥（与 Access Token 相同）
+        settings.TOKEN_ALGORITHM,  # 算法（如 HS256）
+    )
+    return refresh_token, jti, expire
+
+
+def _issue_token_keys_and_args(
+    user_id: str,
+    multi_login: bool,
+    access: tuple[str, str, datetime],
+    refresh: tuple[str, str, datetime] | None,
+    extra_info: dict,
+) -> tuple[list[str], list[str | int | float]]:
+    """组装签发脚本的 KEYS 和 ARGV，顺序与 `_ISSUE_TOKEN_LUA` 一致"""
+    access_token, session_uuid, access_expire = access
+    _, refresh_jti, refresh_expire = refresh or ("", "", access_expire)
+    keys = [
+        f"{settings.TOKEN_SESSION_REDIS_PREFIX}:{user_id}",
         f"{settings.TOKEN_REDIS_PREFIX}:{user_id}:{session_uuid}",
-        settings.TOKEN_EXPIRE_SECONDS,  # 过期时间（秒）
-        access_token,  # 存储的 Token 值
+        f"{settings.TOKEN_EXTRA_INFO_REDIS_PREFIX}:{user_id}:{session_uuid}",
+        f"{settings.TOKEN_REFRESH_SESSION_REDIS_PREFIX}:{user_id}",
+        # Key 示例：REFRESH_TOKEN:1:Xk2c9vB7qLm0aZ1d，值仅作占位
+        f"{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}:{refresh_jti}",
+        settings.TOKEN_SESSION_INDEX_REDIS_KEY,
+    ]
+    args = [
+        int(multi_login),
+        session_uuid,
+        access_token,
+        settings.TOKEN_EXPIRE_SECONDS,
+        # 会话索引按 Redis 会话过期时间排序，滑动过期模式下早于 JWT 过期时间
+        min(access_expire.timestamp(), timezone.now().timestamp() + settings.TOKEN_EXPIRE_SECONDS),
+        json.dumps(extra_info, ensure_ascii=False) if extra_info else "",
+        refresh_jti,
+        1,
+        settings.TOKEN_REFRESH_EXPIRE_SECONDS,
+        refresh_expire.timestamp(),
+        timezone.now().timestamp(),
+        f"{user_id}:",
+    ]
+    return keys, args
+
+
+async def _run_issue_script(
+    script: AsyncScript,
+    user_id: str,
+    multi_login: bool,
+    keys: list[str],
+    args: list[str | int | float],
+    *,
+    refresh: bool,
+) -> list[str] | None:
+    """
+    执行签发 / 刷新脚本，单设备登录时先读取待吊销的会话和 Refresh Token，将对应 key 追加到 KEYS
+
+    :param script: 签发或刷新脚本
+    :param user_id: 用户唯一标识
+    :param multi_login: 是否允许多设备登录
+    :param keys: 脚本固定 KEYS
+    :param args: 脚本固定 ARGV
+    :param refresh: 是否签发 Refresh Token（同时吊销旧 Refresh Token）
+    :return: 被吊销的会话 ID，刷新脚本校验旧 Refresh Token 失败时返回 None
+    """
+    if multi_login:
+        return await script(keys=keys, args=args)
+
+    for _ in range(_ISSUE_TOKEN_RETRIES):
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.zrange(f"{settings.TOKEN_SESSION_REDIS_PREFIX}:{user_id}", 0, -1)
+            if refresh:
+                pipe.zrange(f"{settings.TOKEN_REFRESH_SESSION_REDIS_PREFIX}:{user_id}", 0, -1)
+            session_uuids, *rest = await pipe.execute()
+        refresh_jtis = rest[0] if rest else []
+        revoke_keys = []
+        for session_uuid in session_uuids:
+            revoke_keys.append(f"{settings.TOKEN_REDIS_PREFIX}:{user_id}:{session_uuid}")
+            revoke_keys.append(f"{settings.TOKEN_EXTRA_INFO_REDIS_PREFIX}:{user_id}:{session_uuid}")
+        for refresh_jti in refresh_jtis:
+            revoke_keys.append(f"{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}:{refresh_jti}")
+        revoke_args = [len(session_uuids), *session_uuids, len(refresh_jtis), *refresh_jtis]
+
+        revoked = await script(keys=keys + revoke_keys, args=args + revoke_args)
+        if revoked != -1:
+            return revoked
+        # 随机退避，避免并发签发持续冲突
+        await asyncio.sleep(random.random() * 0.01)
+    raise ServerError(msg="登录繁忙，请稍后重试")
+
+
+async def create_access_token(user_id: str, multi_login: bool, **kwargs) -> AccessToken:
+    """
+    生成加密的 Access Token，存储与旧会话清理在一次 Redis 脚本调用中原子完成
+
+    :param user_id: 用户唯一标识
+    :param multi_login: 是否允许多设备登录
+    :param kwargs: 附加信息（如权限数据）
+    :return: AccessToken 对象
+    """
+    access = _encode_access_token(user_id)
+    keys, args = _issue_token_keys_and_args(user_id, multi_login, access, None, kwargs)
+    revoked = await _run_issue_script(
+        _issue_token_script, user_id, multi_login, keys, args, refresh=False
     )
 
-    # 存储附加信息（如用户权限数据）
-    if kwargs:
-        await redis_client.setex(
-            f"{settings.TOKEN_EXTRA_INFO_REDIS_PREFIX}:{user_id}:{session_uuid}",  # Key 示例：TOKEN_EXTRA_INFO:1:d7d1a8c0...
-            settings.TOKEN_EXPIRE_SECONDS,  # 与 Token 相同的过期时间
-            json.dumps(kwargs, ensure_ascii=False),  # 序列化为 JSON 字符串
-        )
+    # 多设备登录控制：脚本已删除该用户所有旧 Token
+    if multi_login is False:
+        revoke_token_payload_cache(int(user_id))
+        await session_revocation.publish(revoked)
+        if revoked:
+            await session_event_hub.publish("revoked", user_id, revoked)
 
     # 返回结构化 Token 对象
+    access_token, session_uuid, expire = access
     return AccessToken(
         access_token=access_token,
         access_token_expire_time=expire,
@@ -105,46 +383,48 @@ async def create_access_token(user_id: str, multi_login: bool, **kwargs) -> Acce
     )
 
 
-async def create_refresh_token(user_id: str, multi_login: bool) -> RefreshToken:
+async def create_login_token(
+    user_id: str, multi_login: bool, **kwargs
+) -> tuple[AccessToken, RefreshToken]:
     """
-    生成 Refresh Token（仅用于刷新 Access Token）
+    登录时同时生成 Access Token 和 Refresh Token，一次 Redis 脚本调用原子完成
 
     :param user_id: 用户唯一标识
     :param multi_login: 是否允许多设备登录
-    :return: RefreshToken 对象
+    :param kwargs: 附加信息（如权限数据）
+    :return: (AccessToken 对象, RefreshToken 对象)
     """
-    # 计算过期时间（通常比 Access Token 长，一般是8 天）
-    expire = timezone.now() + timedelta(seconds=settings.TOKEN_REFRESH_EXPIRE_SECONDS)
-
-    # JWT 编码（仅包含用户 ID 和过期时间）
-    refresh_token = jwt.encode(
-        {"exp": expire, "sub": user_id},  # Payload
-        settings.TOKEN_SECRET_KEY,  # 密钥（与 Access Token 相同）
-        settings.TOKEN_ALGORITHM,  # 算法（如 HS256）
+    access = _encode_access_token(user_id)
+    refresh = _encode_refresh_token(user_id)
+    keys, args = _issue_token_keys_and_args(user_id, multi_login, access, refresh, kwargs)
+    revoked = await _run_issue_script(
+        _issue_token_script, user_id, multi_login, keys, args, refresh=True
     )
 
-    # 多设备登录控制
+    # 多设备登录控制：脚本已删除该用户所有旧 Token 和 Refresh Token
     if multi_login is False:
-        # 删除该用户所有旧 Refresh Token（格式示例：REFRESH_TOKEN:1:*）
-        await redis_client.delete_prefix(
-            f"{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}"
-        )
-
-    # 存储 Refresh Token（Key 示例：REFRESH_TOKEN:1:eyJhbGciOiJIUzI1NiIsIn...）
-    await redis_client.setex(
-        f"{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}:{refresh_token}",  # 包含完整 Token
-        settings.TOKEN_REFRESH_EXPIRE_SECONDS,  # 过期时间（通常较长）
-        refresh_token,  # 存储值与 Key 中的 Token 相同，便于验证
+        revoke_token_payload_cache(int(user_id))
+        await session_revocation.publish(revoked)
+        if revoked:
+            await session_event_hub.publish("revoked", user_id, revoked)
+
+    access_token, session_uuid, access_expire = access
+    refresh_token, _, refresh_expire = refresh
+    return (
+        AccessToken(
+            access_token=access_token,
+            access_token_expire_time=access_expire,
+            session_uuid=session_uuid,
+        ),
+        RefreshToken(refresh_token=refresh_token, refresh_token_expire_time=refresh_expire),
     )
 
-    return RefreshToken(refresh_token=refresh_token, refresh_token_expire_time=expire)
-
 
 async def create_new_token(
     user_id: str, token: str, refresh_token: str, multi_login: bool, **kwargs
 ) -> NewToken:
     """
-    通过 Refresh Token 生成新 Token
+    通过 Refresh Token 生成新 Token，校验、吊销旧 Token 与签发新 Token 在一次 Redis 脚本调用中原子完成
 
     :param user_id: 用户唯一标识
     :param token: 旧 Access Token（需验证有效性）
@@ -153,47 +433,127 @@ async def create_new_token(
     :param kwargs: 新 Token 的附加信息
     :return: NewToken 对象（包含新 Access/Refresh Token）
     """
-    # 验证 Refresh Token 是否有效
-    redis_refresh_token = await redis_client.get(
-        f"{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}:{refresh_token}"
-    )
-    # 检查 Redis 中是否存在且值匹配
-    if not redis_refresh_token or redis_refresh_token != refresh_token:
-        raise TokenError(msg="Refresh Token 已过期")
-
     # 解码旧 Access Token 获取会话信息
-    token_payload = jwt_decode(token)  # 自定义解码函数（后文定义）
+    token_payload = jwt_decode_access(token)
+    # 解码旧 Refresh Token 获取 jti
+    refresh_jti = jwt_decode(refresh_token).jti
+    if not refresh_jti:
+        raise TokenError(msg="Refresh Token 无效")
 
     # 生成新 Token
-    new_access_token = await create_access_token(user_id, multi_login, **kwargs)
-    new_refresh_token = await create_refresh_token(user_id, multi_login)
-
-    # 删除旧 Token（防止重复使用）
-    keys = [
+    access = _encode_access_token(user_id)
+    refresh = _encode_refresh_token(user_id)
+    keys, args = _issue_token_keys_and_args(user_id, multi_login, access, refresh, kwargs)
+    keys += [
+        # 旧 Refresh Token 的 Redis Key
+        f"{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}:{refresh_jti}",
         # 旧 Access Token 的 Redis Key
         f"{settings.TOKEN_REDIS_PREFIX}:{user_id}:{token_payload.session_uuid}",
-        # 旧 Refresh Token 的 Redis Key
-        f"{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}:{refresh_token}",
+        f"{settings.TOKEN_EXTRA_INFO_REDIS_PREFIX}:{user_id}:{token_payload.session_uuid}",
     ]
-    for key in keys:
-        await redis_client.delete(key)  # 异步删除 Key
+    args += [token_payload.session_uuid, refresh_jti]
+
+    # 验证 Refresh Token 是否有效（Redis 中存在），校验失败时脚本不做任何修改
+    revoked = await _run_issue_script(
+        _rotate_token_script, user_id, multi_login, keys, args, refresh=True
+    )
+    if revoked is None:
+        raise TokenError(msg="Refresh Token 已过期")
+    # 单设备登录时被吊销的会话包含旧会话本身
+    revoked = [s for s in revoked if s != token_payload.session_uuid]
+
+    # 删除旧 Token（防止重复使用）
+    if multi_login is False:
+        revoke_token_payload_cache(int(user_id))
+    else:
+        revoke_token_payload_cache(int(user_id), token_payload.session_uuid)
+    await session_revocation.publish([token_payload.session_uuid, *revoked])
+    if revoked:
+        await session_event_hub.publish("revoked", user_id, revoked)
 
+    access_token, session_uuid, access_expire = access
+    new_refresh_token, _, refresh_expire = refresh
     return NewToken(
-        new_access_token=new_access_token.access_token,
-        new_access_token_expire_time=new_access_token.access_token_expire_time,
-        new_refresh_token=new_refresh_token.refresh_token,
-        new_refresh_token_expire_time=new_refresh_token.refresh_token_expire_time,
-        session_uuid=new_access_token.session_uuid,  # 新会话 ID
+        new_access_token=access_token,
+        new_access_token_expire_time=access_expire,
+        new_refresh_token=new_refresh_token,
+        new_refresh_token_expire_time=refresh_expire,
+        session_uuid=session_uuid,  # 新会话 ID
+    )
+
+
+async def revoke_token(
+    user_id: int | str, session_uuid: str, refresh_jti: str | None = None
+) -> None:
+    """
+    吊销单个会话：删除 access token、附加信息及 refresh token，并同步会话索引
+
+    :param user_id: 用户唯一标识
+    :param session_uuid: 会话 ID
+    :param refresh_jti: Refresh Token jti（可选）
+    :return:
+    """
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.delete(
+            f"{settings.TOKEN_REDIS_PREFIX}:{user_id}:{session_uuid}",
+            f"{settings.TOKEN_EXTRA_INFO_REDIS_PREFIX}:{user_id}:{session_uuid}",
+        )
+        pipe.zrem(f"{settings.TOKEN_SESSION_REDIS_PREFIX}:{user_id}", session_uuid)
+        pipe.zrem(settings.TOKEN_SESSION_INDEX_REDIS_KEY, f"{user_id}:{session_uuid}")
+        if refresh_jti:
+            pipe.delete(f"{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}:{refresh_jti}")
+            pipe.zrem(
+                f"{settings.TOKEN_REFRESH_SESSION_REDIS_PREFIX}:{user_id}", refresh_jti
+            )
+        await pipe.execute()
+    revoke_token_payload_cache(int(user_id), session_uuid)
+    await session_revocation.publish([session_uuid])
+
+
+async def revoke_user_tokens(user_id: int | str) -> list[str]:
+    """
+    吊销用户的全部会话，通过会话索引一次往返完成
+
+    :param user_id: 用户唯一标识
+    :return: 被吊销的会话 ID
+    """
+    session_uuids, _ = await redis_client.delete_index(
+        {
+            f"{settings.TOKEN_SESSION_REDIS_PREFIX}:{user_id}": [
+                f"{settings.TOKEN_REDIS_PREFIX}:{user_id}:",
+                f"{settings.TOKEN_EXTRA_INFO_REDIS_PREFIX}:{user_id}:",
+            ],
+            f"{settings.TOKEN_REFRESH_SESSION_REDIS_PREFIX}:{user_id}": [
+                f"{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}:"
+            ],
+        }
     )
+    if session_uuids:
+        await redis_client.zrem(
+            settings.TOKEN_SESSION_INDEX_REDIS_KEY, *[f"{user_id}:{s}" for s in session_uuids]
+        )
+    revoke_token_payload_cache(int(user_id))
+    await session_revocation.publish(session_uuids)
+    return session_uuids
+
+
+def token_digest(token: str) -> bytes:
+    """计算 token 摘要，用作进程内缓存的 key，避免在内存中保存完整 token"""
+    return hashlib.sha256(token.encode()).digest()
 
 
 def jwt_decode(token: str) -> TokenPayload:
     """
-    解码并验证 Token 有效性
+    解码并验证 Token 有效性，验证通过的载荷会缓存到 token 过期为止
 
     :param token: JWT 字符串
     :return: TokenPayload 对象（包含用户 ID 和会话信息）
     """
+    digest = token_digest(token)
+    cache_payload = token_payload_cache.get(digest)
+    if cache_payload is not None:
+        return cache_payload
+
     try:
         # 解码 JWT（自动验证签名和过期时间）
         payload = jwt.decode(
@@ -202,10 +562,11 @@ def jwt_decode(token: str) -> TokenPayload:
             algorithms=[settings.TOKEN_ALGORITHM],  # 必须指定允许的算法列表
         )
 
-        # 提取关键字段（兼容开发模式）
-        session_uuid = payload.get("session_uuid") or "debug"  # 开发环境可能不传此字段
+        # 提取关键字段，Refresh Token 不包含会话 ID
+        session_uuid = payload.get("session_uuid") or ""
         user_id = payload.get("sub")  # JWT 标准字段 subject
         expire_time = payload.get("exp")  # 过期时间戳
+        jti = payload.get("jti")  # Refresh Token 唯一标识
 
         # 验证必要字段是否存在
         if not user_id:
@@ -217,11 +578,89 @@ def jwt_decode(token: str) -> TokenPayload:
         raise TokenError(msg="Token 无效")
 
     # 返回结构化数据
-    return TokenPayload(
+    token_payload = TokenPayload(
         id=int(user_id),
         session_uuid=session_uuid,
         expire_time=expire_time or (timezone.now() + timedelta(days=1)),
+        jti=jti,
     )
+    # 没有过期时间的 token 不缓存
+    if expire_time:
+        token_payload_cache.set(digest, token_payload, expire_timestamp=expire_time)
+        _index_token_payload(digest, token_payload)
+    return token_payload
+
+
+def jwt_decode_access(token: str) -> TokenPayload:
+    """
+    解码并验证 Access Token，Refresh Token（包含 jti）或缺少会话 ID 的 Token 不能用于认证
+
+    :param token: JWT 字符串
+    :return:
+    """
+    token_payload = jwt_decode(token)
+    if token_payload.jti or not token_payload.session_uuid:
+        raise TokenError(msg="Token 无效")
+    return token_payload
+
+
+def _index_token_payload(digest: bytes, token_payload: TokenPayload) -> None:
+    """登记 token 载荷缓存的会话索引，索引条目超过缓存容量两倍时清理已被淘汰的摘要"""
+    global _token_payload_index_size
+
+    sessions = _token_payload_index.setdefault(token_payload.id, {})
+    sessions.setdefault(token_payload.session_uuid, set()).add(digest)
+    _token_payload_index_size += 1
+    if _token_payload_index_size > 2 * token_payload_cache.maxsize:
+        _compact_token_payload_index()
+
+
+def _compact_token_payload_index() -> None:
+    """清理会话索引中已被缓存淘汰的摘要，每次清理前至少新增 maxsize 个条目，均摊为 O(1)"""
+    global _token_payload_index_size
+
+    size = 0
+    for user_id in list(_token_payload_index):
+        sessions = _token_payload_index[user_id]
+        for session_uuid in list(sessions):
+            digests = {digest for digest in sessions[session_uuid] if digest in token_payload_cache}
+            if digests:
+                sessions[session_uuid] = digests
+                size += len(digests)
+            else:
+                del sessions[session_uuid]
+        if not sessions:
+            del _token_payload_index[user_id]
+    _token_payload_index_size = size
+
+
+def revoke_token_payload_cache(user_id: int, session_uuid: str | None = None) -> None:
+    """
+    吊销会话时清除进程内的 token 载荷缓存
+
+    :param user_id: 用户 ID
+    :param session_uuid: 会话 ID，不传时清除该用户的全部会话
+    :return:
+    """
+    global _token_payload_index_size
+
+    sessions = _token_payload_index.get(user_id)
+    if not sessions:
+        return
+    if session_uuid is None:
+        digest_sets = list(sessions.values())
+        del _token_payload_index[user_id]
+    else:
+        digests = sessions.pop(session_uuid, None)
+        if digests is None:
+            return
+        digest_sets = [digests]
+        if not sessions:
+            del _token_payload_index[user_id]
+    for digests in digest_sets:
+        _token_payload_index_size -= len(digests)
+        for digest in digests:
+            token_payload_cache.pop(digest)
 
 
 async def get_current_user(db: AsyncSession, pk: int) -> User:
@@ -253,38 +692,261 @@ async def jwt_authentication(token: str) -> UserInfoDetail:
     :param token: JWT 字符串
     :return: 用户详细信息
     """
-    # 解码 Token 获取基础信息
-    token_payload = jwt_decode(token)
-    user_id = token_payload.id
+    digest = token_digest(token)
+    rejected = rejected_token_cache.get(digest)
+    if rejected is not None:
+        raise TokenError(msg=rejected)
 
-    # 验证 Token 是否在 Redis 中有效
-    token_verify = await redis_client.get(
-        f"{settings.TOKEN_REDIS_PREFIX}:{user_id}:{token_payload.session_uuid}"
+    try:
+        # 解码 Token 获取基础信息
+        token_payload = jwt_decode_access(token)
+        user = await _authenticate(token_payload)
+    except TokenError as e:
+        # 无效、过期、吊销的 token 不会再次生效，可以安全地缓存拒绝结果
+        # 用户被锁定（AuthorizationError）可能被解除，不缓存
+        rejected_token_cache.set(digest, e.detail)
+        raise
+    # 记录会话在线状态
+    session_presence.touch(token_payload.session_uuid)
+    if _sliding_expire:
+        _extend_session(token_payload)
+    return user
+
+
+async def session_authentication(user_id: int, session_uuid: str) -> UserInfoDetail:
+    """
+    按会话认证（如事件连接票据），会话仍有效时返回用户信息
+
+    :param user_id: 用户 ID
+    :param session_uuid: 会话 ID
+    :return:
+    """
+    return await _authenticate(
+        TokenPayload(id=user_id, session_uuid=session_uuid, expire_time=timezone.now())
     )
-    if not token_verify:
-        raise TokenError(msg="Token 已过期")  # Redis 中不存在或已过期
 
+
+async def _authenticate(token_payload: TokenPayload) -> UserInfoDetail:
+    """校验 Token 会话并获取用户信息"""
+    user_id = token_payload.id
+
+    # 无状态校验：签名和过期时间已校验，仅需检查本地吊销列表
+    if session_revocation.enabled:
+        if session_revocation.is_revoked(token_payload.session_uuid):
+            raise TokenError(msg="Token 已过期")
+        user = user_info_cache.get(user_id)
+        if user is not None:
+            return user
+        invalidate_count = get_invalidate_count()
+        user_key = f"{settings.JWT_USER_REDIS_PREFIX}:{user_id}"
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.get(user_key)
+            pipe.pttl(user_key)
+            cache_user, cache_ttl = await pipe.execute()
+    else:
+        token_key = f"{settings.TOKEN_REDIS_PREFIX}:{user_id}:{token_payload.session_uuid}"
+
+        # 优先使用进程内用户信息缓存，仅需校验 Token 会话
+        user = user_info_cache.get(user_id)
+        if user is not None:
+            if not await redis_client.exists(token_key):
+                raise TokenError(msg="Token 已过期")  # Redis 中不存在或已过期
+            return user
+
+        # 一次往返同时获取 Token 会话、用户信息缓存及其剩余过期时间
+        invalidate_count = get_invalidate_count()
+        user_key = f"{settings.JWT_USER_REDIS_PREFIX}:{user_id}"
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.mget(token_key, user_key)
+            pipe.pttl(user_key)
+            (token_verify, cache_user), cache_ttl = await pipe.execute()
+        if not token_verify:
+            raise TokenError(msg="Token 已过期")  # Redis 中不存在或已过期
+
+    return await _load_user(user_id, cache_user, invalidate_count, cache_ttl)
+
+
+async def _load_user(
+    user_id: int, cache_user: str | None, invalidate_count: int, cache_ttl: int | None = None
+) -> UserInfoDetail:
+    """
+    由用户信息 Redis 缓存得到用户信息，缓存未命中时查询数据库并回填，结果写入进程内缓存
+
+    :param user_id: 用户 ID
+    :param cache_user: 用户信息 Redis 缓存
+    :param invalidate_count: 读取 Redis 缓存之前的用户缓存失效计数，读取期间发生失效时不写入进程内缓存
+    :param cache_ttl: 用户信息 Redis 缓存剩余过期时间，单位：毫秒，用于提前刷新
+    :return:
+    """
     # 检查用户信息 Redis 缓存
-    cache_user = await redis_client.get(f"{settings.JWT_USER_REDIS_PREFIX}:{user_id}")
     if not cache_user:
-        #  Redis 缓存未命中，查询数据库
-        async with async_db_session() as db:
-            current_user = await get_current_user(db, user_id)
-            # 序列化用户信息
-            user = UserInfoDetail(**select_as_dict(current_user))
-            # 存储到 Redis
-            await redis_client.setex(
-                f"{settings.JWT_USER_REDIS_PREFIX}:{user_id}",
-                settings.JWT_USER_REDIS_EXPIRE_SECONDS,
-                user.model_dump_json(),  # Pydantic 模型转 JSON
-            )
-    else:
-        # 使用缓存数据（允许部分字段缺失）
-        user = UserInfoDetail.model_validate(from_json(cache_user, allow_partial=True))
+        #  Redis 缓存未命中，查询数据库，同一用户的并发请求只查询一次
+        return await _user_loader.do(user_id, lambda: _load_user_from_db(user_id))
+
+    # 使用缓存数据（允许部分字段缺失）
+    user = UserInfoDetail.model_validate(from_json(cache_user, allow_partial=True))
+    if (
+        cache_ttl is not None
+        and user_id not in _user_loader
+        and _should_early_refresh(cache_ttl)
+    ):
+        _spawn(_refresh_user(user_id))
+
+    set_local_cache(user_info_cache, user_id, user, invalidate_count)
+    return user
+
 
+async def _load_user_from_db(user_id: int) -> UserInfoDetail:
+    """查询数据库用户信息并回填 Redis 缓存和进程内缓存，加载期间用户数据发生变更时不回填"""
+    global _user_load_seconds
+
+    start = time.perf_counter()
+    invalidate_count = get_invalidate_count()
+    version = await get_user_cache_version(user_id)
+    async with async_db_session() as db:
+        current_user = await get_current_user(db, user_id)
+        # 序列化用户信息
+        user = UserInfoDetail(**select_as_dict(current_user))
+    # 存储到 Redis
+    if await set_user_cache(
+        user_id,
+        version,
+        f"{settings.JWT_USER_REDIS_PREFIX}:{user_id}",
+        user.model_dump_json(),  # Pydantic 模型转 JSON
+        settings.JWT_USER_REDIS_EXPIRE_SECONDS,
+    ):
+        set_local_cache(user_info_cache, user_id, user, invalidate_count)
+    _user_load_seconds = time.perf_counter() - start
     return user
 
 
+def _should_early_refresh(cache_ttl: int) -> bool:
+    """
+    概率提前刷新（XFetch）：越接近过期、加载越慢，刷新概率越高，热点用户的缓存不会在高负载下过期
+
+    :param cache_ttl: 剩余过期时间，单位：毫秒
+    :return:
+    """
+    if not settings.JWT_USER_EARLY_REFRESH or cache_ttl < 0:
+        return False
+    beta = settings.JWT_USER_EARLY_REFRESH_BETA
+    gap = _user_load_seconds * beta * -math.log(1.0 - random.random())
+    return gap * 1000 >= cache_ttl
+
+
+async def _refresh_user(user_id: int) -> None:
+    """后台刷新用户信息缓存"""
+    try:
+        await _user_loader.do(user_id, lambda: _load_user_from_db(user_id))
+    except Exception as e:
+        log.warning(f"提前刷新用户信息缓存失败 {user_id}: {e}")
+
+
+def _spawn(coro: Coroutine[Any, Any, None]) -> None:
+    """创建后台任务并保留引用"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def _extend_session(token_payload: TokenPayload) -> None:
+    """
+    滑动过期：延长 Redis 会话有效期，每个会话在续期间隔内最多续期一次，在后台执行不阻塞请求
+
+    :param token_payload: 已通过校验的 Token 载荷
+    :return:
+    """
+    session_uuid = token_payload.session_uuid
+    if session_uuid in session_extend_cache:
+        return
+    session_extend_cache.set(session_uuid, True)
+    _spawn(_extend_token(token_payload.id, session_uuid))
+
+
+async def _extend_token(user_id: int, session_uuid: str) -> None:
+    """后台续期 Token 会话"""
+    keys = [
+        f"{settings.TOKEN_SESSION_REDIS_PREFIX}:{user_id}",
+        f"{settings.TOKEN_REDIS_PREFIX}:{user_id}:{session_uuid}",
+        f"{settings.TOKEN_EXTRA_INFO_REDIS_PREFIX}:{user_id}:{session_uuid}",
+        settings.TOKEN_SESSION_INDEX_REDIS_KEY,
+    ]
+    args = [
+        session_uuid,
+        settings.TOKEN_EXPIRE_SECONDS,
+        timezone.now().timestamp() + settings.TOKEN_EXPIRE_SECONDS,
+        f"{user_id}:{session_uuid}",
+    ]
+    try:
+        await _extend_token_script(keys=keys, args=args)
+    except Exception as e:
+        session_extend_cache.pop(session_uuid)
+        log.warning(f"Token 会话续期失败 {user_id}:{session_uuid}: {e}")
+
+
+async def jwt_authentication_batch(tokens: list[str]) -> list[UserInfoDetail | None]:
+    """
+    批量 JWT 认证，所有 Token 会话和用户信息缓存在一次 Redis 往返中获取
+
+    :param tokens: JWT 字符串列表
+    :return: 与 tokens 一一对应的用户详细信息，认证失败为 None
+    """
+    payloads: list[TokenPayload | None] = []
+    for token in tokens:
+        digest = token_digest(token)
+        if digest in rejected_token_cache:
+            payloads.append(None)
+            continue
+        try:
+            payload = jwt_decode_access(token)
+        except TokenError as e:
+            rejected_token_cache.set(digest, e.detail)
+            payload = None
+        if payload is not None and session_revocation.is_revoked(payload.session_uuid):
+            payload = None
+        payloads.append(payload)
+
+    valid = [payload for payload in payloads if payload is not None]
+    users: dict[int, UserInfoDetail | None] = {}
+    for payload in valid:
+        if payload.id not in users:
+            users[payload.id] = user_info_cache.get(payload.id)
+    user_ids = [user_id for user_id, user in users.items() if user is None]
+    check_session = not session_revocation.enabled and bool(valid)
+    invalidate_count = get_invalidate_count()
+
+    # 一次往返：逐个校验 Token 会话，批量获取进程内缓存未命中的用户信息
+    async with redis_client.pipeline(transaction=False) as pipe:
+        if check_session:
+            for payload in valid:
+                pipe.exists(f"{settings.TOKEN_REDIS_PREFIX}:{payload.id}:{payload.session_uuid}")
+        if user_ids:
+            pipe.mget([f"{settings.JWT_USER_REDIS_PREFIX}:{user_id}" for user_id in user_ids])
+        results = await pipe.execute() if check_session or user_ids else []
+
+    cache_users = dict(zip(user_ids, results.pop())) if user_ids else {}
+    sessions = iter(results if check_session else [1] * len(valid))
+
+    data: list[UserInfoDetail | None] = []
+    for payload in payloads:
+        if payload is None or not next(sessions):
+            data.append(None)
+            continue
+        # 仅为会话有效的 Token 加载用户信息，Redis 缓存未命中时查询数据库
+        if payload.id in cache_users:
+            try:
+                users[payload.id] = await _load_user(
+                    payload.id, cache_users.pop(payload.id), invalidate_count
+                )
+            except (TokenError, AuthorizationError):
+                pass  # 用户不存在或已被锁定
+        user = users[payload.id]
+        if user is not None:
+            session_presence.touch(payload.session_uuid)
+        data.append(user)
+    return data
+
+
 def get_token(request: Request) -> str:
     """
     从请求头中提取并验证 Bearer Token
@@ -309,19 +971,40 @@ def get_token(request: Request) -> str:
     return token  # 返回纯 Token 字符串（不含 "Bearer" 前缀）
 
 
-def admin_verify(request: Request) -> bool:
+# JWT 认证白名单，启动时编译
+token_path_exclude: PathMatcher = PathMatcher(settings.TOKEN_REQUEST_PATH_EXCLUDE)
+
+# 仅用于解析 Bearer Token 和生成 OpenAPI 认证信息，缺少 Token 时由 `jwt_auth` 统一报错
+_http_bearer = HTTPBearer(auto_error=False)
+
+
+async def jwt_auth(
+    request: Request,
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(_http_bearer)],
+) -> UserInfoDetail | None:
     """
-    通过 Token 验证当前用户是否为管理员
+    按需认证：仅在路由依赖时执行 JWT 认证，结果写入 `request.user`，同一请求内只认证一次
 
-    :param request: FastAPI 请求对象（包含用户信息）
-    :return: 布尔值（True 表示是管理员）
-    :raises AuthorizationError: 如果用户非管理员则抛出异常
+    :param request: FastAPI 请求对象
+    :param credentials: Bearer Token
+    :return: 用户详细信息，白名单路径返回 None
     """
-    # 从请求对象中提取用户的管理员权限状态
-    # request.user 来自于 中间件 补充
-    admin = request.user.is_admin
+    user = request.scope.get("user")
+    if isinstance(user, UserInfoDetail):
+        return user
+
+    # 白名单路径无需认证
+    if token_path_exclude.match(request.scope["path"]):
+        return None
+
+    if credentials is None or credentials.scheme.lower() != "bearer":
+        raise TokenError(msg="Token 无效")
+
+    user = await jwt_authentication(credentials.credentials)
+    request.scope["user"] = user
+    request.scope["auth"] = AuthCredentials(["authenticated"])
+    return user
 
-    if not admin:
-        raise AuthorizationError(msg="权限不足，请联系管理员")
 
-    return admin
+# JWT 认证依赖注入（按需解析请求头中的 Bearer Token 并认证）
+DependsJwtAuth = Depends(jwt_auth)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from typing import Literal
+
+# 密码加密验证库
+from pwdlib import PasswordHash
+from pwdlib.hashers import HasherProtocol
+from pwdlib.hashers.bcrypt import BcryptHasher
+
+from backend.common.executor import BoundedExecutor
+from backend.core.config import settings
+
+
+def build_hasher(
+    name: Literal["argon2", "bcrypt"],
+    *,
+    bcrypt_rounds: int = settings.PASSWORD_BCRYPT_ROUNDS,
+    argon2_time_cost: int = settings.PASSWORD_ARGON2_TIME_COST,
+    argon2_memory_cost: int = settings.PASSWORD_ARGON2_MEMORY_COST,
+    argon2_parallelism: int = settings.PASSWORD_ARGON2_PARALLELISM,
+) -> HasherProtocol:
+    """
+    按名称构建密码哈希器
+
+    :param name: 算法名称
+    :param bcrypt_rounds: bcrypt 计算成本
+    :param argon2_time_cost: argon2 迭代次数
+    :param argon2_memory_cost: argon2 内存占用，单位：KiB
+    :param argon2_parallelism: argon2 并行度
+    :return:
+    """
+    if name == "argon2":
+        # argon2 为可选依赖（pwdlib[argon2]），仅在配置使用时导入
+        from pwdlib.hashers.argon2 import Argon2Hasher
+
+        return Argon2Hasher(
+            time_cost=argon2_time_cost,
+            memory_cost=argon2_memory_cost,
+            parallelism=argon2_parallelism,
+        )
+    return BcryptHasher(rounds=bcrypt_rounds)
+
+
+# 密码哈希实例初始化，多个哈希器可共存，第一个为当前使用的算法
+password_hash = PasswordHash([build_hasher(name) for name in settings.PASSWORD_HASHERS])
+
+# 密码哈希执行器，密码哈希计算耗时数十毫秒，不能在事件循环中执行
+password_executor = BoundedExecutor(
+    "password",
+    kind=settings.PASSWORD_EXECUTOR,
+    max_workers=settings.PASSWORD_EXECUTOR_MAX_WORKERS,
+    max_queue=settings.PASSWORD_EXECUTOR_MAX_QUEUE,
+)
+
+
+def hash_password(password: str) -> str:
+    """同步加密密码（盐值随机生成并包含在哈希字符串中），仅在密码执行器中调用"""
+    return password_hash.hash(password)
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """
+    同步验证密码，哈希算法或成本与当前配置不一致时返回新的哈希值，仅在密码执行器中调用
+
+    :param plain_password: 明文密码
+    :param hashed_password: 哈希值
+    :return: (是否匹配, 新的哈希值或 None)
+    """
+    return password_hash.verify_and_update(plain_password, hashed_password)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+
+from redis.asyncio import Redis
+
+from backend.common.logger import log
+from backend.core.config import settings
+from backend.database.redis import redis_client
+from backend.utils.cache import LocalCache
+
+
+class SessionPresence:
+    """
+    会话在线状态
+        - Redis 有序集合，成员为 session_uuid，分数为最后活跃时间戳
+        - 认证通过的请求只在本地记录，每个会话在一个上报周期内最多写入一次，由后台任务批量 ZADD
+        - 最后活跃时间在 `expire` 秒内视为在线，后台任务定期裁剪过期成员
+    """
+
+    def __init__(self, client: Redis, key: str, *, interval: int, expire: int):
+        """
+        :param client: Redis 客户端
+        :param key: 有序集合 key
+        :param interval: 上报周期，单位：秒
+        :param expire: 在线判定时间，单位：秒
+        """
+        self._client = client
+        self._key = key
+        self._interval = interval
+        self._expire = expire
+        # 本周期内已上报的会话，过期后可再次上报
+        self._reported: LocalCache[str, bool] = LocalCache(
+            "session_presence", maxsize=settings.TOKEN_ONLINE_LOCAL_CACHE_MAXSIZE, ttl=interval
+        )
+        # 待写入的会话 -> 最后活跃时间戳
+        self._pending: dict[str, float] = {}
+        self._last_trim = 0.0
+        self._task: asyncio.Task | None = None
+
+    def touch(self, session_uuid: str) -> None:
+        """记录会话活跃"""
+        if session_uuid in self._reported:
+            return
+        self._reported.set(session_uuid, True)
+        self._pending[session_uuid] = time.time()
+
+    def online_since(self) -> float:
+        """在线判定的最早活跃时间戳"""
+        return time.time() - self._expire
+
+    async def online_sessions(self) -> list[str]:
+        """当前在线的会话"""
+        return await self._client.zrangebyscore(self._key, self.online_since(), "+inf")
+
+    async def start(self) -> None:
+        """启动后台上报任务"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止后台上报任务，并写入剩余记录"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._flush()
+
+    async def _flush(self) -> None:
+        if self._pending:
+            pending, self._pending = self._pending, {}
+            await self._client.zadd(self._key, pending)
+        now = time.time()
+        if now - self._last_trim >= self._interval:
+            self._last_trim = now
+            await self._client.zremrangebyscore(self._key, "-inf", now - self._expire)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(1)
+            try:
+                await self._flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error("会话在线状态上报失败: {}", e)
+
+
+# 创建会话在线状态单例
+session_presence: SessionPresence = SessionPresence(
+    redis_client,
+    settings.TOKEN_ONLINE_REDIS_PREFIX,
+    interval=settings.TOKEN_ONLINE_INTERVAL_SECONDS,
+    expire=settings.TOKEN_ONLINE_EXPIRE_SECONDS,
+)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import json
+from typing import Annotated, Iterable, Iterator
+
+from fastapi.dependencies.models import Dependant
+from fastapi.routing import APIRoute
+from starlette.routing import BaseRoute
+
+from backend.app.admin.crud.permission import permission_crud
+from backend.app.admin.schema.user import UserInfoDetail
+from backend.common.exception.errors import AuthorizationError
+from backend.common.security.jwt import DependsJwtAuth
+from backend.common.security.user_cache import (
+    get_invalidate_count,
+    get_user_cache_version,
+    set_local_cache,
+    set_user_cache,
+    user_permission_cache,
+)
+from backend.core.config import settings
+from backend.database.mysql import async_db_session
+from backend.database.redis import redis_client
+
+
+class RequestPermission:
+    """
+    路由权限声明，作为路由依赖使用：`Depends(RequestPermission("sys:user:delete"))`
+        - 创建时即在 `rbac` 中为权限标识分配固定的位，校验时只做一次位运算
+        - 超级管理员拥有所有权限
+    """
+
+    __slots__ = ("code", "bit")
+
+    def __init__(self, code: str):
+        """
+        :param code: 权限标识
+        """
+        self.code = code
+        self.bit = rbac.register(code)
+
+    async def __call__(
+        self, user: Annotated[UserInfoDetail | None, DependsJwtAuth]
+    ) -> None:
+        if user is None:
+            raise AuthorizationError(msg="权限不足，请联系管理员")
+        if user.is_admin:
+            return
+        if not (await rbac.get_user_bitset(user.id)) >> self.bit & 1:
+            raise AuthorizationError(msg="权限不足，请联系管理员")
+
+
+class RBAC:
+    """
+    基于角色的访问控制
+        - 每个权限标识在声明时分配一个进程内固定的位（Redis 中只缓存权限标识，位的分配不跨进程共享）
+        - 用户权限缓存为位图（int），与用户信息缓存同步失效，热路径不查询数据库
+    """
+
+    def __init__(self):
+        # 权限标识 -> 位
+        self.bits: dict[str, int] = {}
+
+    def register(self, code: str) -> int:
+        """
+        登记权限标识，返回其对应的位，同一权限标识重复登记返回相同的位
+
+        :param code: 权限标识
+        :return:
+        """
+        bit = self.bits.get(code)
+        if bit is None:
+            bit = self.bits[code] = len(self.bits)
+        return bit
+
+    def compile(self, routes: Iterable[BaseRoute]) -> None:
+        """
+        校验应用路由的权限声明，已登记权限标识但在路由中找不到任何声明时启动失败，
+        避免路由结构变化（如 FastAPI 延迟展开子路由）导致权限校验静默失效
+
+        :param routes: 应用路由
+        :return:
+        """
+        declared = {
+            permission.code
+            for route in _iter_api_routes(routes)
+            for permission in _find_permissions(route.dependant)
+        }
+        if self.bits and not declared:
+            raise RuntimeError("RBAC 编译失败：已登记权限标识，但未在应用路由中找到任何权限声明")
+
+    def bitset(self, codes: Iterable[str]) -> int:
+        """权限标识转位图，未在路由中声明的权限标识忽略"""
+        bitset = 0
+        for code in codes:
+            bit = self.bits.get(code)
+            if bit is not None:
+                bitset |= 1 << bit
+        return bitset
+
+    async def get_user_bitset(self, user_id: int) -> int:
+        """
+        获取用户权限位图：进程内缓存 -> Redis -> 数据库
+
+        :param user_id: 用户 ID
+        :return:
+        """
+        bitset = user_permission_cache.get(user_id)
+        if bitset is not None:
+            return bitset
+
+        # Redis 中缓存权限标识而非位图，位的分配在各进程中独立
+        # 角色、权限变更没有主动失效，缓存时间较短，变更在过期后生效
+        invalidate_count = get_invalidate_count()
+        key = f"{settings.JWT_USER_PERMISSION_REDIS_PREFIX}:{user_id}"
+        cache_codes = await redis_client.get(key)
+        if cache_codes is not None:
+            codes = json.loads(cache_codes)
+        else:
+            version = await get_user_cache_version(user_id)
+            async with async_db_session() as db:
+                codes = await permission_crud.get_codes_by_user(db, user_id)
+            await set_user_cache(
+                user_id,
+                version,
+                key,
+                json.dumps(codes),
+                settings.JWT_USER_PERMISSION_REDIS_EXPIRE_SECONDS,
+            )
+
+        bitset = self.bitset(codes)
+        set_local_cache(user_permission_cache, user_id, bitset, invalidate_count)
+        return bitset
+
+
+def _iter_api_routes(routes: Iterable[BaseRoute]) -> Iterator[APIRoute]:
+    """递归遍历路由，包括 FastAPI 延迟展开的子路由（`original_router`）"""
+    for route in routes:
+        if isinstance(route, APIRoute):
+            yield route
+        router = getattr(route, "original_router", None)
+        if router is not None:
+            yield from _iter_api_routes(router.routes)
+
+
+def _find_permissions(dependant: Dependant) -> list[RequestPermission]:
+    """递归查找路由依赖中的权限声明"""
+    permissions = []
+    for dependency in dependant.dependencies:
+        if isinstance(dependency.call, RequestPermission):
+            permissions.append(dependency.call)
+        permissions.extend(_find_permissions(dependency))
+    return permissions
+
+
+# 创建 RBAC 单例
+rbac: RBAC = RBAC()
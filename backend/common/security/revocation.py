@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+from typing import Iterable
+
+from redis.asyncio import Redis
+
+from backend.common.logger import log
+from backend.core.config import settings
+from backend.database.redis import redis_client
+
+
+class SessionRevocationList:
+    """
+    进程内会话吊销列表，用于无状态 Token 校验模式（`TOKEN_STATELESS_VERIFY`）
+        - 吊销会话时将 session_uuid 写入 Redis Stream，各进程通过 XREAD 同步到本地
+        - Token 最长有效期为 `TOKEN_EXPIRE_SECONDS`，超过该时间的吊销记录无意义，Stream 与本地均按此裁剪
+        - 同步存在毫秒级延迟，其他进程在收到吊销记录前仍会放行该会话
+    """
+
+    def __init__(self, client: Redis, stream: str, retention: int, *, enabled: bool):
+        """
+        :param client: Redis 客户端
+        :param stream: Stream 名称
+        :param retention: 吊销记录保留时间，单位：秒
+        :param enabled: 是否启用，未启用时不写入也不同步
+        """
+        self._client = client
+        self._stream = stream
+        self._retention = retention
+        self.enabled = enabled
+        # session_uuid -> 吊销时间戳
+        self._revoked: dict[str, float] = {}
+        self._last_id = "0-0"
+        self._last_prune = 0.0
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def is_revoked(self, session_uuid: str) -> bool:
+        """会话是否已被吊销"""
+        return session_uuid in self._revoked
+
+    async def publish(self, session_uuids: Iterable[str]) -> None:
+        """
+        吊销会话，立即在本进程生效，并通过 Stream 通知其他进程
+
+        :param session_uuids: 会话 ID
+        :return:
+        """
+        if not self.enabled:
+            return
+        session_uuids = [s for s in session_uuids if s]
+        if not session_uuids:
+            return
+        now = time.time()
+        for session_uuid in session_uuids:
+            self._revoked[session_uuid] = now
+        # 按最小 ID 裁剪 Stream，仅保留仍可能有效的 Token 的吊销记录
+        min_id = int((now - self._retention) * 1000)
+        async with self._client.pipeline(transaction=False) as pipe:
+            for session_uuid in session_uuids:
+                pipe.xadd(self._stream, {"s": session_uuid}, minid=min_id, approximate=True)
+            await pipe.execute()
+
+    async def start(self) -> None:
+        """加载已有的吊销记录后启动后台同步任务，加载完成前不对外提供服务"""
+        if not self.enabled or self._task is not None:
+            return
+        while await self._read(block=None):
+            pass
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """停止后台同步任务"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _read(self, block: int | None) -> int:
+        """读取一批吊销记录，返回读取条数"""
+        response = await self._client.xread(
+            {self._stream: self._last_id}, count=1000, block=block
+        )
+        count = 0
+        for _, entries in response:
+            for entry_id, fields in entries:
+                # Stream ID 前半部分为写入时的毫秒时间戳
+                self._revoked[fields["s"]] = int(entry_id.split("-", 1)[0]) / 1000
+                self._last_id = entry_id
+                count += 1
+        return count
+
+    def _prune(self) -> None:
+        """清除已超过 Token 最长有效期的吊销记录，每分钟最多一次"""
+        now = time.time()
+        if now - self._last_prune < 60:
+            return
+        self._last_prune = now
+        deadline = now - self._retention
+        for session_uuid in [s for s, t in self._revoked.items() if t < deadline]:
+            del self._revoked[session_uuid]
+
+    async def _listen(self) -> None:
+        # 阻塞时间需小于 Redis 客户端的 socket 超时时间
+        block = max(settings.REDIS_TIMEOUT - 1, 1) * 1000
+        while True:
+            try:
+                await self._read(block=block)
+                self._prune()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error("会话吊销记录同步异常，1 秒后重试: {}", e)
+                await asyncio.sleep(1)
+
+
+# 创建会话吊销列表单例
+session_revocation: SessionRevocationList = SessionRevocationList(
+    redis_client,
+    settings.TOKEN_REVOKE_STREAM,
+    settings.TOKEN_EXPIRE_SECONDS,
+    enabled=settings.TOKEN_STATELESS_VERIFY,
+)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import secrets
+from typing import Literal
+
+from starlette.websockets import WebSocket
+
+from backend.common.logger import log
+from backend.core.config import settings
+from backend.database.redis import redis_client, redis_subscriber
+
+# kick_out: 管理员踢出会话; revoked: 会话被服务端吊销（如用户删除、在其他设备登录）;
+# online / offline: 会话建立 / 断开事件连接（仅推送给管理员）
+SessionEventType = Literal["kick_out", "revoked", "online", "offline"]
+
+# 推送后需要关闭连接的事件
+_CLOSE_EVENTS = {"kick_out", "revoked"}
+
+
+class SessionEventHub:
+    """
+    会话事件推送
+        - 事件通过 Redis 频道广播，每个进程只通过 `redis_subscriber` 的一个 pub/sub 连接接收
+        - 进程内只保存连接索引，不为每个连接创建额外的任务或队列，空闲连接只占用其 WebSocket 对象
+        - 普通连接只接收自己会话的事件，管理员连接接收所有事件
+    """
+
+    def __init__(self):
+        # user_id -> session_uuid -> 连接
+        self._connections: dict[int, dict[str, WebSocket]] = {}
+        self._admins: set[WebSocket] = set()
+
+    def __len__(self) -> int:
+        return sum(len(sessions) for sessions in self._connections.values())
+
+    async def connect(
+        self, websocket: WebSocket, user_id: int, session_uuid: str, *, is_admin: bool
+    ) -> None:
+        """
+        登记连接，同一会话的旧连接会被替换
+
+        :param websocket: 已接受的 WebSocket 连接
+        :param user_id: 用户 ID
+        :param session_uuid: 会话 ID
+        :param is_admin: 是否接收所有事件
+        :return:
+        """
+        self._connections.setdefault(user_id, {})[session_uuid] = websocket
+        if is_admin:
+            self._admins.add(websocket)
+        await self.publish("online", user_id, [session_uuid])
+
+    async def disconnect(self, websocket: WebSocket, user_id: int, session_uuid: str) -> None:
+        """注销连接"""
+        self._admins.discard(websocket)
+        sessions = self._connections.get(user_id)
+        if sessions is not None and sessions.get(session_uuid) is websocket:
+            del sessions[session_uuid]
+            if not sessions:
+                del self._connections[user_id]
+            await self.publish("offline", user_id, [session_uuid])
+
+    async def publish(
+        self,
+        event: SessionEventType,
+        user_id: int | str,
+        session_uuids: list[str] | None = None,
+    ) -> None:
+        """
+        广播会话事件
+
+        :param event: 事件类型
+        :param user_id: 用户 ID
+        :param session_uuids: 会话 ID，为空时表示该用户的全部会话
+        :return:
+        """
+        message = json.dumps(
+            {"event": event, "user_id": int(user_id), "session_uuids": session_uuids}
+        )
+        await redis_client.publish(settings.TOKEN_SESSION_EVENT_CHANNEL, message)
+
+    @staticmethod
+    async def issue_ticket(user_id: int, session_uuid: str) -> str:
+        """
+        签发事件连接票据：浏览器 WebSocket 无法设置请求头，用一次性短期票据代替 token 放在 URL 中，
+        URL 会被记录到访问日志，票据使用后立即失效
+
+        :param user_id: 用户 ID
+        :param session_uuid: 会话 ID
+        :return:
+        """
+        ticket = secrets.token_urlsafe(24)
+        await redis_client.set(
+            f"{settings.TOKEN_SESSION_EVENT_TICKET_REDIS_PREFIX}:{ticket}",
+            f"{user_id}:{session_uuid}",
+            ex=settings.TOKEN_SESSION_EVENT_TICKET_EXPIRE_SECONDS,
+        )
+        return ticket
+
+    @staticmethod
+    async def consume_ticket(ticket: str) -> tuple[int, str] | None:
+        """
+        使用事件连接票据
+
+        :param ticket: 票据
+        :return: (用户 ID, 会话 ID)，票据无效或已使用时返回 None
+        """
+        value = await redis_client.getdel(f"{settings.TOKEN_SESSION_EVENT_TICKET_REDIS_PREFIX}:{ticket}")
+        if not value:
+            return None
+        user_id, session_uuid = value.split(":", 1)
+        return int(user_id), session_uuid
+
+    async def _dispatch(self, message: str) -> None:
+        """分发其他进程（包括本进程）广播的事件"""
+        data = json.loads(message)
+        event, user_id, session_uuids = data["event"], data["user_id"], data["session_uuids"]
+
+        targets: dict[WebSocket, bool] = {websocket: False for websocket in self._admins}
+        if event in _CLOSE_EVENTS:
+            sessions = self._connections.get(user_id, {})
+            for session_uuid, websocket in list(sessions.items()):
+                if session_uuids is None or session_uuid in session_uuids:
+                    targets[websocket] = True
+        if targets:
+            await asyncio.gather(
+                *(self._send(websocket, message, close) for websocket, close in targets.items())
+            )
+
+    @staticmethod
+    async def _send(websocket: WebSocket, message: str, close: bool) -> None:
+        try:
+            await websocket.send_text(message)
+            if close:
+                await websocket.close(code=4001)
+        except Exception as e:
+            log.debug("会话事件推送失败: {}", e)
+
+
+# 创建会话事件推送单例
+session_event_hub: SessionEventHub = SessionEventHub()
+
+redis_subscriber.register(settings.TOKEN_SESSION_EVENT_CHANNEL, session_event_hub._dispatch)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from typing import Any
+
+from backend.app.admin.schema.user import UserInfoDetail
+from backend.core.config import settings
+from backend.database.redis import redis_client, redis_subscriber
+from backend.utils.cache import LocalCache
+
+# 进程内用户信息缓存（一级缓存），Redis `JWT_USER_REDIS_PREFIX` 为二级缓存
+user_info_cache: LocalCache[int, UserInfoDetail] = LocalCache(
+    "user_info",
+    maxsize=settings.JWT_USER_LOCAL_CACHE_MAXSIZE,
+    ttl=settings.JWT_USER_LOCAL_EXPIRE_SECONDS,
+)
+
+# 进程内用户权限位图缓存，与用户信息缓存同步失效，Redis `JWT_USER_PERMISSION_REDIS_PREFIX` 为二级缓存
+user_permission_cache: LocalCache[int, int] = LocalCache(
+    "user_permission",
+    maxsize=settings.JWT_USER_LOCAL_CACHE_MAXSIZE,
+    ttl=settings.JWT_USER_LOCAL_EXPIRE_SECONDS,
+)
+
+# 本进程的用户缓存失效计数，本进程或其他进程每次失效时加 1
+# 读取 Redis 或数据库之前记录计数，读取期间发生失效时不回填一级缓存，避免旧数据在失效通知之后写回
+_invalidate_count: int = 0
+
+# 按版本写入用户缓存：版本与加载前读取的一致时才写入，返回是否写入
+# KEYS: 用户缓存版本, 缓存
+# ARGV: 加载前读取的版本, 缓存值, 过期秒数
+_SET_IF_VERSION_LUA = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+_set_if_version_script = redis_client.register_script(_SET_IF_VERSION_LUA)
+
+
+def _version_key(user_id: int) -> str:
+    # 版本不设置过期时间，过期后重新计数可能与加载前读取的版本相同
+    return f"{settings.JWT_USER_VERSION_REDIS_PREFIX}:{user_id}"
+
+
+async def get_user_cache_version(user_id: int) -> str:
+    """
+    获取用户缓存版本，在查询数据库之前调用
+
+    :param user_id: 用户 ID
+    :return:
+    """
+    return await redis_client.get(_version_key(user_id)) or "0"
+
+
+async def set_user_cache(user_id: int, version: str, key: str, value: str, expire: int) -> bool:
+    """
+    写入从数据库加载的用户缓存，加载期间用户数据发生变更（版本变化）时放弃写入，避免旧数据覆盖失效结果
+
+    :param user_id: 用户 ID
+    :param version: 查询数据库之前读取的版本
+    :param key: 缓存 key
+    :param value: 缓存值
+    :param expire: 过期时间，单位：秒
+    :return: 是否写入
+    """
+    return bool(
+        await _set_if_version_script(keys=[_version_key(user_id), key], args=[version, value, expire])
+    )
+
+
+def get_invalidate_count() -> int:
+    """
+    获取本进程的用户缓存失效计数，在读取 Redis 或数据库之前调用
+
+    :return:
+    """
+    return _invalidate_count
+
+
+def set_local_cache(
+    cache: LocalCache[int, Any], user_id: int, value: Any, invalidate_count: int
+) -> None:
+    """
+    回填一级缓存，读取期间本进程收到任何用户缓存失效时放弃回填
+
+    :param cache: 一级缓存
+    :param user_id: 用户 ID
+    :param value: 缓存值
+    :param invalidate_count: 读取之前的失效计数
+    :return:
+    """
+    if invalidate_count == _invalidate_count:
+        cache.set(user_id, value)
+
+
+def _evict_local(user_id: int) -> None:
+    """清除一级缓存并增加失效计数"""
+    global _invalidate_count
+
+    _invalidate_count += 1
+    user_info_cache.pop(user_id)
+    user_permission_cache.pop(user_id)
+
+
+async def invalidate_user_cache(user_id: int) -> None:
+    """
+    用户数据（包括角色、权限）变更后清除用户信息和权限缓存，并通知所有进程清除一级缓存
+
+    :param user_id: 用户 ID
+    :return:
+    """
+    _evict_local(user_id)
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.incr(_version_key(user_id))
+        pipe.delete(
+            f"{settings.JWT_USER_REDIS_PREFIX}:{user_id}",
+            f"{settings.JWT_USER_PERMISSION_REDIS_PREFIX}:{user_id}",
+        )
+        pipe.publish(settings.JWT_USER_INVALIDATE_CHANNEL, str(user_id))
+        await pipe.execute()
+
+
+def _on_user_invalidate(message: str) -> None:
+    """其他进程的用户信息变更通知"""
+    _evict_local(int(message))
+
+
+redis_subscriber.register(settings.JWT_USER_INVALIDATE_CHANNEL, _on_user_invalidate)
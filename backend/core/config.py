@@ -28,6 +28,7 @@ class Settings(BaseSettings):
     UVICORN_HOST: str = "127.0.0.1"
     UVICORN_PORT: int = 6972
     UVICORN_RELOAD: bool = True
+    UVICORN_VERIFY_PORT: int = 6973  # 认证校验服务（`backend/verify.py`）端口
 
     # ==============  FastAPI  ==============
     API_ROUTE_PREFIX: str = "/api"
@@ -97,6 +98,7 @@ class Settings(BaseSettings):
         )
 
     # ============== Redis ==============
+    # 仅支持单机（或主从 / 哨兵）Redis：同一用户的会话相关 key 在 Lua 脚本和 MGET 中一起访问，不在同一哈希槽
     REDIS_HOST: str = "127.0.0.1"
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: str = ""
@@ -107,6 +109,14 @@ class Settings(BaseSettings):
     # ==============  JWT ================
     JWT_USER_REDIS_PREFIX: str = "fs:user"
     JWT_USER_REDIS_EXPIRE_SECONDS: int = 604800  # 过期时间 7 天，单位：秒
+    JWT_USER_LOCAL_EXPIRE_SECONDS: int = 60  # 进程内用户信息缓存过期时间 1 分钟，单位：秒
+    JWT_USER_LOCAL_CACHE_MAXSIZE: int = 10000  # 进程内用户信息缓存的最大条目数
+    JWT_USER_INVALIDATE_CHANNEL: str = "fs:user:invalidate"  # 用户信息缓存失效通知频道
+    JWT_USER_VERSION_REDIS_PREFIX: str = "fs:user:version"  # 用户缓存版本，用户数据变更时递增，旧版本加载的数据不会写回缓存
+    JWT_USER_EARLY_REFRESH: bool = False  # 用户信息 Redis 缓存接近过期时按概率提前刷新（XFetch）
+    JWT_USER_EARLY_REFRESH_BETA: float = 1.0  # 提前刷新系数，越大越早刷新
+    JWT_USER_PERMISSION_REDIS_PREFIX: str = "fs:user:permission"  # 用户权限标识缓存
+    JWT_USER_PERMISSION_REDIS_EXPIRE_SECONDS: int = 300  # 用户权限标识缓存过期时间 5 分钟，角色、权限变更在过期后生效，单位：秒
 
     # ==============  Token  ==============
     TOKEN_SECRET_KEY: str = secrets.token_urlsafe(32)  # 密钥
@@ -115,12 +125,42 @@ class Settings(BaseSettings):
     TOKEN_REFRESH_EXPIRE_SECONDS: int = 691200  # refresh token 过期时间 8 天，单位：秒
     TOKEN_REDIS_PREFIX: str = "fs:token"
     TOKEN_REFRESH_REDIS_PREFIX: str = "fs:refresh_token"
+    TOKEN_SESSION_REDIS_PREFIX: str = "fs:token_session"  # 用户 access token 会话索引（有序集合）
+    TOKEN_REFRESH_SESSION_REDIS_PREFIX: str = "fs:refresh_token_session"  # 用户 refresh token 索引（有序集合）
+    TOKEN_SESSION_INDEX_REDIS_KEY: str = "fs:token_session_index"  # 全局会话索引（有序集合），成员为 user_id:session_uuid，按过期时间排序
     TOKEN_EXTRA_INFO_REDIS_PREFIX: str = "fs:token_extra_info"  # token 存储在 Redis 额外信息
-    TOKEN_ONLINE_REDIS_PREFIX: str = "fs:token_online"  # token 在线状态 存储在 Redis
-    TOKEN_REQUEST_PATH_EXCLUDE: list[str] = [  # JWT / RBAC 白名单
+    TOKEN_ONLINE_REDIS_PREFIX: str = "fs:token_online"  # token 在线状态（有序集合），成员为 session_uuid，分数为最后活跃时间戳
+    TOKEN_ONLINE_INTERVAL_SECONDS: int = 60  # 在线状态上报周期，每个会话周期内最多写入一次，单位：秒
+    TOKEN_ONLINE_EXPIRE_SECONDS: int = 300  # 最后活跃时间在该时间内视为在线，单位：秒
+    TOKEN_ONLINE_LOCAL_CACHE_MAXSIZE: int = 100000  # 进程内已上报会话记录的最大条目数
+    TOKEN_SESSION_EVENT_CHANNEL: str = "fs:session:event"  # 会话事件（踢出、吊销、上下线）推送频道
+    TOKEN_SESSION_EVENT_TICKET_REDIS_PREFIX: str = "fs:session:ticket"  # 会话事件连接票据，一次性使用，避免 token 出现在 URL 中
+    TOKEN_SESSION_EVENT_TICKET_EXPIRE_SECONDS: int = 30  # 会话事件连接票据过期时间，单位：秒
+    TOKEN_PAYLOAD_CACHE_MAXSIZE: int = 10000  # 进程内已验证 token 载荷缓存的最大条目数
+    TOKEN_REJECTED_CACHE_MAXSIZE: int = 10000  # 进程内被拒绝 token 缓存的最大条目数
+    TOKEN_REJECTED_CACHE_SECONDS: int = 60  # 被拒绝 token 的缓存时间，单位：秒
+    TOKEN_STATELESS_VERIFY: bool = False  # 无状态校验：仅校验签名和过期时间，吊销通过本地吊销列表判断，不再访问 Redis 会话
+    TOKEN_REVOKE_STREAM: str = "fs:token_revoke"  # 会话吊销记录 Stream，无状态校验模式下各进程据此同步吊销列表
+    TOKEN_SLIDING_EXPIRE: bool = False  # 滑动过期：有效请求延长 Redis 会话有效期，TOKEN_EXPIRE_SECONDS 变为空闲过期时间（无状态校验模式下不生效）
+    TOKEN_SLIDING_INTERVAL_SECONDS: int = 3600  # 滑动过期的续期间隔，每个会话在间隔内最多续期一次，单位：秒
+    TOKEN_SLIDING_MAX_SECONDS: int = 2592000  # 滑动过期模式下 token 的最长有效期 30 天（JWT exp），单位：秒
+    TOKEN_INTROSPECT_SECRET: str | None = None  # 内部服务批量校验 Token 的密钥（请求头 X-Internal-Secret），为空时禁用该接口
+    TOKEN_INTROSPECT_MAX_BATCH: int = 100  # 单次批量校验的最大 Token 数
+    TOKEN_REQUEST_PATH_EXCLUDE: list[str] = [  # JWT / RBAC 白名单，支持 `*` 单段通配和末尾 `**` 多段通配
         f"{API_ROUTE_PREFIX}/auth/login",
     ]
 
+    # ==============  Password  ==============
+    # 密码哈希算法，第一个用于加密新密码，其余仅用于验证旧密码，登录成功后自动升级为第一个算法
+    PASSWORD_HASHERS: list[Literal["argon2", "bcrypt"]] = ["bcrypt"]
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # bcrypt 计算成本（2^rounds 次迭代）
+    PASSWORD_ARGON2_TIME_COST: int = 3  # argon2 迭代次数
+    PASSWORD_ARGON2_MEMORY_COST: int = 65536  # argon2 内存占用，单位：KiB
+    PASSWORD_ARGON2_PARALLELISM: int = 4  # argon2 并行度
+    PASSWORD_EXECUTOR: Literal["thread", "process"] = "thread"  # 密码哈希执行器类型（线程池 / 进程池）
+    PASSWORD_EXECUTOR_MAX_WORKERS: int = 4  # 密码哈希执行器最大并发数
+    PASSWORD_EXECUTOR_MAX_QUEUE: int = 64  # 密码哈希最大排队数，超过后返回 503
+
     # # ==============  Cookies  ==================
     COOKIE_REFRESH_TOKEN_KEY: str = "fs_refresh_token"
     COOKIE_REFRESH_TOKEN_EXPIRE_SECONDS: int = TOKEN_REFRESH_EXPIRE_SECONDS
@@ -131,8 +171,12 @@ class Settings(BaseSettings):
 
     # ==============  Ip location  ==============
     IP_LOCATION_PARSE: Literal["online", "offline", "false"] = "offline"
-    IP_LOCATION_REDIS_PREFIX: str = "fs:ip:location"
+    IP_LOCATION_REDIS_PREFIX: str = "fs:ip:location"  # 在线解析结果缓存，key 为 `前缀:block:地址段起始 IP` 或 `前缀:ip:地址`
     IP_LOCATION_EXPIRE_SECONDS: int = 86400  # 过期时间 1 天，单位：秒
+    IP_LOCATION_CACHE_MAXSIZE: int = 10000  # 进程内 ip 属地缓存的最大条目数（按地址段）
+
+    # ==============  User agent  ==============
+    USER_AGENT_CACHE_MAXSIZE: int = 4096  # 进程内 User-Agent 解析结果缓存的最大条目数
 
     # ============== 日志 Log ==============
     LOG_ROOT_LEVEL: str = "NOTSET"
@@ -7,18 +7,22 @@ from asgi_correlation_id import CorrelationIdMiddleware
 from fastapi import FastAPI
 from fastapi_limiter import FastAPILimiter
 from fastapi_pagination import add_pagination
-from starlette.middleware.authentication import AuthenticationMiddleware
 
 from backend.app.router import all_routes
 from backend.common.exception.handler import register_exception
-from backend.common.logger import register_logger
+from backend.common.logger import log, register_logger
 from backend.common.response.check import ensure_unique_route_names, http_limit_callback
+from backend.common.security.password import password_executor
+from backend.common.security.presence import session_presence
+from backend.common.security.rbac import rbac
+from backend.common.security.revocation import session_revocation
 from backend.core.config import settings
-from backend.core.paths import STATIC_DIR
+from backend.core.paths import STATIC_DIR, Ip2RegionPath
 from backend.database.mysql import create_table
-from backend.database.redis import redis_client
+from backend.database.redis import redis_client, redis_subscriber
 from backend.middleware.jwt_auth import JwtAuthMiddleware
 from backend.middleware.state import StateMiddleware
+from backend.utils.ip2region import ip2region
 from backend.utils.openapi import simplify_operation_ids
 
 
@@ -28,18 +32,43 @@ async def register_lifespan(_: FastAPI):
     await create_table()
     # 连接 redis
     await redis_client.open()
+    # 预加载 redis Lua 脚本
+    await redis_client.load_scripts()
     # 初始化 limiter
     await FastAPILimiter.init(
         redis=redis_client,
         prefix=settings.REQUEST_LIMITER_REDIS_PREFIX,
         http_callback=http_limit_callback,
     )
+    # 启动 redis 订阅
+    await redis_subscriber.start()
+    # 同步会话吊销列表（仅无状态校验模式）
+    await session_revocation.start()
+    # 启动会话在线状态上报
+    await session_presence.start()
+    # 加载 ip2region 离线库（在线解析时用于按地址段缓存）
+    if settings.IP_LOCATION_PARSE != "false":
+        try:
+            ip2region.open(Ip2RegionPath)
+        except OSError as e:
+            log.error(f"ip2region 离线库加载失败，错误信息：{e}")
     yield
 
+    # 释放 ip2region 离线库
+    ip2region.close()
+
+    # 停止会话在线状态上报
+    await session_presence.stop()
+    # 停止会话吊销列表同步
+    await session_revocation.stop()
+    # 停止 redis 订阅
+    await redis_subscriber.stop()
     # 关闭 redis 连接
     await redis_client.close()
     # 关闭 limiter
     await FastAPILimiter.close()
+    # 关闭密码哈希执行器
+    password_executor.shutdown()
 
 
 def register_app():
@@ -96,9 +125,7 @@ def register_middleware(app) -> None:
     """
 
     # JWT 认证（必须）
-    app.add_middleware(
-        AuthenticationMiddleware, backend=JwtAuthMiddleware(), on_error=JwtAuthMiddleware.auth_exception_handler
-    )
+    app.add_middleware(JwtAuthMiddleware)
 
     # 接口访问日志
     if settings.MIDDLEWARE_ACCESS:
@@ -143,6 +170,8 @@ def register_router(app: FastAPI):
     # Extra
     ensure_unique_route_names(app)
     simplify_operation_ids(app)
+    # RBAC 路由权限表
+    rbac.compile(app.routes)
 
 
 def register_page(app: FastAPI):
@@ -1,14 +1,61 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import asyncio
+import inspect
 import sys
+from typing import Any, Awaitable, Callable
 
 from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
 from redis.exceptions import AuthenticationError, TimeoutError
 
 from backend.common.logger import log
 from backend.core.config import settings
 
 
+# 按索引删除：KEYS 依次为有序集合索引、每个「索引成员 x 前缀」对应的 key（均由调用方预先读取后传入）
+# ARGV: 索引数量, 然后依次为每个索引的「成员数量, 前缀数量, 成员...」
+# 先校验各索引的成员与调用方读取的一致，不一致时不做任何修改并返回 -1，由调用方重新读取后重试
+# 一致时删除成员对应的 key 以及索引本身，返回每个索引被删除的成员
+_DELETE_INDEX_LUA = """
+local count = tonumber(ARGV[1])
+local pos = 2
+for i = 1, count do
+    local n = tonumber(ARGV[pos])
+    local members = redis.call('ZRANGE', KEYS[i], 0, -1)
+    if #members ~= n then
+        return -1
+    end
+    for j, member in ipairs(members) do
+        if member ~= ARGV[pos + 1 + j] then
+            return -1
+        end
+    end
+    pos = pos + n + 2
+end
+local removed = {}
+local kpos = count + 1
+pos = 2
+for i = 1, count do
+    local n, m = tonumber(ARGV[pos]), tonumber(ARGV[pos + 1])
+    removed[i] = {}
+    for j = 1, n do
+        removed[i][j] = ARGV[pos + 1 + j]
+    end
+    for j = kpos, kpos + n * m - 1 do
+        redis.call('DEL', KEYS[j])
+    end
+    kpos = kpos + n * m
+    redis.call('DEL', KEYS[i])
+    pos = pos + n + 2
+end
+return removed
+"""
+
+# 删除索引时乐观锁校验失败的最大重试次数
+_DELETE_INDEX_RETRIES = 5
+
+
 class RedisClient(Redis):
     def __init__(self):
         super(RedisClient, self).__init__(
@@ -19,6 +66,8 @@ class RedisClient(Redis):
             socket_timeout=settings.REDIS_TIMEOUT,
             decode_responses=True,
         )
+        self._scripts: list[AsyncScript] = []
+        self._delete_index_script = self.register_script(_DELETE_INDEX_LUA)
 
     async def open(self):
         """
@@ -37,6 +86,24 @@ class RedisClient(Redis):
             log.error("❌ Redis 连接异常 {}", e)
             sys.exit()
 
+    def register_script(self, script: str) -> AsyncScript:  # type: ignore[override]
+        """
+        注册 Lua 脚本，并记录以便在启动时预加载
+
+        :param script: Lua 脚本
+        :return:
+        """
+        async_script = super().register_script(script)
+        self._scripts.append(async_script)
+        return async_script
+
+    async def load_scripts(self):
+        """
+        预加载所有已注册的 Lua 脚本，之后均通过 SHA 调用（EVALSHA）
+        """
+        for script in self._scripts:
+            await self.script_load(script.script)
+
     async def delete_prefix(self, prefix: str, exclude: str | list | None = None):
         """
         删除指定前缀的所有key
@@ -58,6 +125,91 @@ class RedisClient(Redis):
         if keys:
             await self.delete(*keys)
 
+    async def delete_index(self, indexes: dict[str, list[str]]) -> list[list[str]]:
+        """
+        按有序集合索引删除 key：先读取索引成员，再由脚本校验并原子删除，耗时只与索引成员数量相关
+        脚本访问的 key 均通过 KEYS 传入，但不保证位于同一哈希槽，不支持 Redis Cluster
+
+        :param indexes: 索引 key -> key 前缀列表，删除「前缀 + 索引成员」以及索引本身
+        :return: 每个索引被删除的成员
+        """
+        for _ in range(_DELETE_INDEX_RETRIES):
+            async with self.pipeline(transaction=False) as pipe:
+                for index in indexes:
+                    pipe.zrange(index, 0, -1)
+                members_list = await pipe.execute()
+            keys: list[str] = list(indexes.keys())
+            args: list[str | int] = [len(indexes)]
+            for prefixes, members in zip(indexes.values(), members_list):
+                args.extend([len(members), len(prefixes), *members])
+                keys.extend(prefix + member for member in members for prefix in prefixes)
+            removed = await self._delete_index_script(keys=keys, args=args)
+            if removed != -1:
+                return removed
+        raise RuntimeError("删除索引失败：索引持续被并发修改")
+
+
+class RedisSubscriber:
+    """
+    Redis 订阅器
+        - 每个进程只建立一个 pub/sub 连接，按频道分发消息给已注册的处理函数
+        - 连接断开后自动重连并重新订阅，断开期间的消息会丢失，依赖方需自行兜底（如本地缓存的短过期时间）
+    """
+
+    def __init__(self, client: Redis):
+        self._client = client
+        self._handlers: dict[str, list[Callable[[str], Awaitable[Any] | Any]]] = {}
+        self._task: asyncio.Task | None = None
+
+    def register(self, channel: str, handler: Callable[[str], Awaitable[Any] | Any]):
+        """
+        注册频道处理函数，需在 `start` 之前调用
+
+        :param channel: 频道名称
+        :param handler: 处理函数，参数为消息内容
+        :return:
+        """
+        self._handlers.setdefault(channel, []).append(handler)
+
+    async def start(self):
+        """启动后台监听任务"""
+        if self._handlers and self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        """停止后台监听任务"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self):
+        while True:
+            pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(*self._handlers.keys())
+                async for message in pubsub.listen():
+                    for handler in self._handlers.get(message["channel"], []):
+                        try:
+                            result = handler(message["data"])
+                            if inspect.isawaitable(result):
+                                await result
+                        except Exception as e:
+                            log.error("Redis 订阅消息处理失败 {}: {}", message["channel"], e)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error("Redis 订阅连接异常，1 秒后重连: {}", e)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
 
 # 创建 redis 客户端单例
 redis_client: RedisClient = RedisClient()
+
+# 创建 redis 订阅器单例
+redis_subscriber: RedisSubscriber = RedisSubscriber(redis_client)
@@ -1,14 +1,13 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import time
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from backend.common.logger import log
-from backend.utils.timezone import timezone
 
 
-class AccessMiddleware(BaseHTTPMiddleware):
+class AccessMiddleware:
     """
     请求日志中间件：
         - 记录每个 HTTP 请求的关键信息，包括：
@@ -17,36 +16,45 @@ class AccessMiddleware(BaseHTTPMiddleware):
         - 响应状态码（如 200、404）
         - 请求路径（如 /api/v1/resource）
         - 请求处理时间（毫秒级）
+    纯 ASGI 实现，通过包装 send 获取响应状态码，不缓冲响应体，流式响应不受影响
     """
 
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         拦截每个 HTTP 请求，记录关键信息并继续调用下一个中间件或视图函数。
 
-        :param request: FastAPI 的 Request 对象，表示当前 HTTP 请求
-        :param call_next: 下一个中间件或视图函数的调用点
-        :return: 响应对象
+        :param scope: ASGI 连接信息
+        :param receive: ASGI 接收通道
+        :param send: ASGI 发送通道
+        :return:
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # 获取请求开始时间
-        start_time = timezone.now()
+        start_time = time.perf_counter()
+        status_code = 500
 
-        # 调用下一个中间件或视图函数，并等待响应返回
-        response = await call_next(request)
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
-        # 获取请求结束时间
-        end_time = timezone.now()
+        # 调用下一个中间件或视图函数，响应发送完成后返回
+        await self.app(scope, receive, send_wrapper)
 
         # 计算请求处理时间，单位为毫秒
-        elapsed_time_ms = round((end_time - start_time).total_seconds(), 3) * 1000.0
+        elapsed_time_ms = round(time.perf_counter() - start_time, 3) * 1000.0
 
         # 记录请求日志
+        client = scope.get("client")
         log.info(
-            f'{(request.client.host if request.client else "unknown"): <15} | {request.method: <5} | {f"{elapsed_time_ms}ms": <9} |'
-            f" {response.status_code: <3} | "
-            f"{request.url.path}"
+            f'{(client[0] if client else "unknown"): <15} | {scope["method"]: <5} | {f"{elapsed_time_ms}ms": <9} |'
+            f" {status_code: <3} | "
+            f'{scope["path"]}'
         )
-
-        # 返回响应对象
-        return response
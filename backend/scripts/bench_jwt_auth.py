@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+jwt_authentication Redis 查询基准测试
+
+对比「两次串行 GET」与「一次 MGET」获取 token 会话和用户缓存的延迟（p50 / p99）。
+需要本地可用的 Redis（读取 `settings.REDIS_*` 配置）。
+
+使用方式::
+
+    python -m backend.scripts.bench_jwt_auth -n 5000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from backend.core.config import settings
+from backend.database.redis import redis_client
+
+_USER_ID = 0
+_SESSION_UUID = "bench-session"
+
+
+def _quantiles(samples: list[float]) -> tuple[float, float]:
+    """返回 p50 / p99，单位：毫秒"""
+    q = statistics.quantiles(samples, n=100)
+    return q[49] * 1000, q[98] * 1000
+
+
+async def _serial_get(token_key: str, user_key: str) -> None:
+    await redis_client.get(token_key)
+    await redis_client.get(user_key)
+
+
+async def _mget(token_key: str, user_key: str) -> None:
+    await redis_client.mget(token_key, user_key)
+
+
+async def main(number: int) -> None:
+    token_key = f"{settings.TOKEN_REDIS_PREFIX}:{_USER_ID}:{_SESSION_UUID}"
+    user_key = f"{settings.JWT_USER_REDIS_PREFIX}:{_USER_ID}"
+    await redis_client.open()
+    await redis_client.set(token_key, "x" * 200, ex=60)
+    await redis_client.set(user_key, "x" * 400, ex=60)
+    try:
+        for name, func in (("serial GET x2", _serial_get), ("MGET", _mget)):
+            # 预热连接池
+            for _ in range(100):
+                await func(token_key, user_key)
+            samples = []
+            for _ in range(number):
+                start = time.perf_counter()
+                await func(token_key, user_key)
+                samples.append(time.perf_counter() - start)
+            p50, p99 = _quantiles(samples)
+            print(f"{name: <14} | p50 {p50:.3f}ms | p99 {p99:.3f}ms")
+    finally:
+        await redis_client.delete(token_key, user_key)
+        await redis_client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="jwt_authentication Redis 查询基准测试")
+    parser.add_argument("-n", "--number", type=int, default=5000, help="每种方式的请求次数")
+    args = parser.parse_args()
+    asyncio.run(main(args.number))
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+中间件栈吞吐量基准测试
+
+通过 `register_middleware` 构建完整中间件栈，直接以 ASGI 调用的方式压测一个空路由，
+对比纯 ASGI 中间件与 `BaseHTTPMiddleware` 实现（`--legacy`）的每秒请求数。
+需要本地可用的 Redis（读取 `settings.REDIS_*` 配置），IP 属地会在预热时写入缓存。
+
+使用方式::
+
+    python -m backend.scripts.bench_middleware -n 20000
+    python -m backend.scripts.bench_middleware -n 20000 --legacy
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI, Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.types import Message
+
+from backend.common.logger import log
+from backend.common.request.parse import parse_ip_info, parse_user_agent_info
+from backend.core import register
+from backend.database.redis import redis_client
+from backend.middleware import access
+
+
+class _LegacyAccessMiddleware(BaseHTTPMiddleware):
+    """`BaseHTTPMiddleware` 实现的请求日志中间件，仅用于对比"""
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        start_time = time.perf_counter()
+        response = await call_next(request)
+        elapsed_time_ms = round(time.perf_counter() - start_time, 3) * 1000.0
+        log.info(
+            f'{(request.client.host if request.client else "unknown"): <15} | {request.method: <5} | {f"{elapsed_time_ms}ms": <9} |'
+            f" {response.status_code: <3} | "
+            f"{request.url.path}"
+        )
+        return response
+
+
+class _LegacyStateMiddleware(BaseHTTPMiddleware):
+    """`BaseHTTPMiddleware` 实现的请求 state 中间件，仅用于对比"""
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        ip_info = await parse_ip_info(request)
+        request.state.ip = ip_info.ip
+        request.state.country = ip_info.country
+        request.state.region = ip_info.region
+        request.state.city = ip_info.city
+        ua_info = parse_user_agent_info(request)
+        request.state.user_agent = ua_info.user_agent
+        request.state.os = ua_info.os
+        request.state.os_version = ua_info.os_version
+        request.state.browser = ua_info.browser
+        request.state.browser_version = ua_info.browser_version
+        request.state.device = ua_info.device
+        request.state.device_model = ua_info.device_model
+        return await call_next(request)
+
+
+def _create_app(legacy: bool) -> FastAPI:
+    if legacy:
+        register.StateMiddleware = _LegacyStateMiddleware
+        access.AccessMiddleware = _LegacyAccessMiddleware
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping() -> dict:
+        return {"code": 200}
+
+    register.register_middleware(app)
+    return app
+
+
+async def _request(app: FastAPI) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"127.0.0.1"),
+            (b"user-agent", b"Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0 Safari/537.36"),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        pass
+
+    await app(scope, receive, send)
+
+
+async def main(number: int, concurrency: int, legacy: bool) -> None:
+    # 请求日志不输出，只保留其格式化开销
+    log.remove()
+    app = _create_app(legacy)
+    await redis_client.open()
+    try:
+        # 预热：构建中间件栈、写入 IP 属地缓存
+        for _ in range(100):
+            await _request(app)
+
+        async def worker(count: int) -> None:
+            for _ in range(count):
+                await _request(app)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(number // concurrency) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        total = number // concurrency * concurrency
+        name = "BaseHTTPMiddleware" if legacy else "pure ASGI"
+        print(f"{name: <18} | {total} requests | {total / elapsed:.0f} req/s")
+    finally:
+        await redis_client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="中间件栈吞吐量基准测试")
+    parser.add_argument("-n", "--number", type=int, default=20000, help="请求次数")
+    parser.add_argument("-c", "--concurrency", type=int, default=50, help="并发数")
+    parser.add_argument("--legacy", action="store_true", help="使用 BaseHTTPMiddleware 实现")
+    args = parser.parse_args()
+    asyncio.run(main(args.number, args.concurrency, args.legacy))
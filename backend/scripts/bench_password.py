@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+密码哈希成本基准测试
+
+在单线程中反复验证密码，测算每种算法 / 成本下单核每秒可支撑的登录次数，用于选择登录集群可承受的成本。
+
+使用方式::
+
+    python -m backend.scripts.bench_password --bcrypt-rounds 10 11 12 13 --argon2 3,65536,4 2,19456,1
+"""
+import argparse
+import time
+
+from backend.common.security.password import build_hasher
+
+
+def bench(label: str, hasher, duration: float) -> None:
+    password = "P@ssw0rd-bench"
+    hashed = hasher.hash(password)
+
+    count = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < duration:
+        hasher.verify(password, hashed)
+        count += 1
+
+    print(
+        f"{label: <32} | {elapsed / count * 1000: >8.2f}ms/次 | {count / elapsed: >8.1f} 次登录/秒/核"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="密码哈希成本基准测试")
+    parser.add_argument(
+        "--bcrypt-rounds", type=int, nargs="*", default=[10, 11, 12, 13], help="bcrypt 成本列表"
+    )
+    parser.add_argument(
+        "--argon2",
+        nargs="*",
+        default=["3,65536,4", "2,19456,1"],
+        help="argon2 参数列表，格式：time_cost,memory_cost(KiB),parallelism",
+    )
+    parser.add_argument("--duration", type=float, default=3.0, help="每种配置的测试时长，单位：秒")
+    args = parser.parse_args()
+
+    for rounds in args.bcrypt_rounds:
+        bench(f"bcrypt rounds={rounds}", build_hasher("bcrypt", bcrypt_rounds=rounds), args.duration)
+
+    for params in args.argon2:
+        time_cost, memory_cost, parallelism = (int(i) for i in params.split(","))
+        hasher = build_hasher(
+            "argon2",
+            argon2_time_cost=time_cost,
+            argon2_memory_cost=memory_cost,
+            argon2_parallelism=parallelism,
+        )
+        bench(f"argon2 t={time_cost} m={memory_cost} p={parallelism}", hasher, args.duration)
+
+
+if __name__ == "__main__":
+    main()
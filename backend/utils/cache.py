@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# 已注册的进程内缓存，用于统一查看命中率等指标
+local_caches: dict[str, "LocalCache"] = {}
+
+_MISSING = object()
+
+
+class LocalCache(Generic[K, V]):
+    """
+    进程内 LRU 缓存（非线程安全，仅在事件循环中使用）
+        - 容量达到 `maxsize` 时淘汰最久未使用的条目
+        - 每个条目可单独指定过期时间，读取时惰性淘汰
+        - 记录命中 / 未命中次数，便于评估缓存收益
+    """
+
+    __slots__ = ("name", "maxsize", "ttl", "hits", "misses", "_data")
+
+    def __init__(self, name: str, *, maxsize: int, ttl: float | None = None):
+        """
+        :param name: 缓存名称，用于指标展示
+        :param maxsize: 最大条目数
+        :param ttl: 默认过期时间，单位：秒；为 None 时不过期
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # key -> (过期时间点(monotonic) | None, value)
+        self._data: OrderedDict[K, tuple[float | None, V]] = OrderedDict()
+        local_caches[name] = self
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return self._lookup(key) is not _MISSING
+
+    def _lookup(self, key: K) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return _MISSING
+        expire_at, value = item
+        if expire_at is not None and expire_at <= time.monotonic():
+            del self._data[key]
+            return _MISSING
+        return value
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        """
+        获取缓存，命中时将条目移动到队尾
+
+        :param key:
+        :param default:
+        :return:
+        """
+        value = self._lookup(key)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key: K, default: V | None = None) -> V | None:
+        """获取缓存，不改变淘汰顺序，也不计入命中率"""
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def set(
+        self,
+        key: K,
+        value: V,
+        *,
+        ttl: float | None = None,
+        expire_timestamp: float | None = None,
+    ) -> None:
+        """
+        写入缓存
+
+        :param key:
+        :param value:
+        :param ttl: 过期时间，单位：秒；不传时使用默认值
+        :param expire_timestamp: 过期时间戳（Unix 时间），优先于 ttl，如 JWT 的 exp
+        :return:
+        """
+        if expire_timestamp is not None:
+            ttl = expire_timestamp - time.time()
+            if ttl <= 0:
+                return
+        elif ttl is None:
+            ttl = self.ttl
+        expire_at = time.monotonic() + ttl if ttl is not None else None
+        self._data[key] = (expire_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> V | None:
+        """删除并返回缓存"""
+        item = self._data.pop(key, None)
+        return item[1] if item is not None else None
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """缓存指标"""
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    合并同一 key 的并发加载（仅在事件循环中使用）
+        - 同一 key 同时只有一个加载任务，其余调用等待该任务的结果
+        - 加载任务独立于调用方，任一调用方被取消不影响其他等待者
+    """
+
+    __slots__ = ("_calls",)
+
+    def __init__(self):
+        self._calls: dict[K, asyncio.Future[V]] = {}
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._calls
+
+    async def do(self, key: K, func: Callable[[], Awaitable[V]]) -> V:
+        """
+        执行加载，已有进行中的加载时直接等待其结果
+
+        :param key:
+        :param func: 加载函数
+        :return:
+        """
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(future)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import mmap
+import socket
+import struct
+
+# xdb 文件格式：256 字节头部 + 256 * 256 向量索引（每项 8 字节：段索引起止偏移）+ 数据区 + 段索引（每项 14 字节）
+_HEADER_SIZE = 256
+_VECTOR_INDEX = struct.Struct("<II")
+_SEGMENT_INDEX = struct.Struct("<IIHI")  # 起始 IP, 结束 IP, 数据长度, 数据偏移
+_IPV4 = struct.Struct("!I")
+
+
+class Ip2Region:
+    """
+    ip2region xdb 离线 IP 属地查询
+        - 启动时以只读方式 mmap 映射整个文件，数据页由操作系统页缓存提供，同一台机器上的多个 worker 进程共享同一份物理内存
+        - 查询直接在映射内存上定位向量索引并二分查找段索引，不读取磁盘，也不复制文件内容，单次查询为微秒级
+    """
+
+    __slots__ = ("_file", "_buffer")
+
+    def __init__(self):
+        self._file = None
+        self._buffer: mmap.mmap | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._buffer is not None
+
+    def open(self, path: str) -> None:
+        """
+        映射 xdb 文件，重复调用不会重新加载
+
+        :param path: xdb 文件路径
+        :return:
+        """
+        if self._buffer is not None:
+            return
+        file = open(path, "rb")
+        try:
+            self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            file.close()
+            raise
+        self._file = file
+
+    def close(self) -> None:
+        """解除映射"""
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def search(self, ip: str) -> str | None:
+        """
+        查询 IPv4 地址的属地
+
+        :param ip: IPv4 地址
+        :return: 属地信息，格式为 `国家|区域|省份|城市|ISP`，未找到时返回 None
+        """
+        segment = self.search_segment(ip)
+        return segment[2] if segment is not None else None
+
+    def search_segment(self, ip: str) -> tuple[int, int, str] | None:
+        """
+        查询 IPv4 地址所在的地址段，同一地址段内的地址属地相同，可作为缓存 key
+
+        :param ip: IPv4 地址
+        :return: (起始 IP, 结束 IP, 属地信息)，未找到时返回 None
+        """
+        buffer = self._buffer
+        if buffer is None:
+            raise RuntimeError("ip2region 数据库未加载")
+        (ip_long,) = _IPV4.unpack(socket.inet_aton(ip))
+        start, end = _VECTOR_INDEX.unpack_from(
+            buffer, _HEADER_SIZE + (ip_long >> 16) * _VECTOR_INDEX.size
+        )
+        low, high = 0, (end - start) // _SEGMENT_INDEX.size
+        while low <= high:
+            middle = (low + high) >> 1
+            start_ip, end_ip, length, offset = _SEGMENT_INDEX.unpack_from(
+                buffer, start + middle * _SEGMENT_INDEX.size
+            )
+            if ip_long < start_ip:
+                high = middle - 1
+            elif ip_long > end_ip:
+                low = middle + 1
+            else:
+                return start_ip, end_ip, buffer[offset : offset + length].decode("utf-8")
+        return None
+
+
+# 创建 ip2region 单例，在应用启动时加载
+ip2region: Ip2Region = Ip2Region()
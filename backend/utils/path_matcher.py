@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from typing import Iterable
+
+
+class _Node:
+    __slots__ = ("children", "star", "glob", "end")
+
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        self.star: _Node | None = None  # `*` 单段通配
+        self.glob = False  # `**` 多段通配：剩余路径为空或以 `/` 开头时匹配
+        self.end = False  # 完整路径在此结束
+
+
+class PathMatcher:
+    """
+    路径匹配器，启动时将路径模式编译为字符前缀树，可供各中间件复用（如认证白名单、访问日志排除）
+        - 精确路径：`/api/auth/login`
+        - `*` 匹配一个非空路径段：`/api/auth/*`
+        - `**` 匹配零个或多个路径段，只能位于末尾：`/static/**`
+    匹配时逐字符遍历前缀树，耗时与路径长度线性相关，不产生额外对象
+    """
+
+    __slots__ = ("patterns", "_root")
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        :param patterns: 路径模式
+        """
+        self.patterns = tuple(patterns)
+        self._root = _Node()
+        for pattern in self.patterns:
+            self._add(pattern)
+
+    def __contains__(self, path: str) -> bool:
+        return self.match(path)
+
+    def _add(self, pattern: str) -> None:
+        if not pattern.startswith("/"):
+            raise ValueError(f"路径模式必须以 / 开头：{pattern}")
+        node = self._root
+        segments = pattern[1:].split("/")
+        for index, segment in enumerate(segments):
+            if segment == "**":
+                if index != len(segments) - 1:
+                    raise ValueError(f"** 只能位于路径模式末尾：{pattern}")
+                node.glob = True
+                return
+            node = node.children.setdefault("/", _Node())
+            if segment == "*":
+                if node.star is None:
+                    node.star = _Node()
+                node = node.star
+                continue
+            if "*" in segment:
+                raise ValueError(f"通配符必须是完整的路径段：{pattern}")
+            for char in segment:
+                node = node.children.setdefault(char, _Node())
+        node.end = True
+
+    def match(self, path: str) -> bool:
+        """
+        路径是否匹配任意模式
+
+        :param path: 请求路径
+        :return:
+        """
+        return self._match(self._root, path, 0)
+
+    def _match(self, node: _Node, path: str, index: int) -> bool:
+        length = len(path)
+        while True:
+            if node.glob and (index == length or path[index] == "/"):
+                return True
+            if index == length:
+                return node.end
+            # `*` 节点只挂在 `/` 之后，消费到下一个 `/` 为止，与字面量分支冲突时回溯
+            if node.star is not None:
+                end = path.find("/", index)
+                if end == -1:
+                    end = length
+                if end > index and self._match(node.star, path, end):
+                    return True
+            node = node.children.get(path[index])
+            if node is None:
+                return False
+            index += 1
@@ -0,0 +1,137 @@
+"""
+认证校验服务，供反向代理子请求使用（如 nginx `auth_request`）
+
+只提供 `/verify` 接口，不加载 CORS、State、访问日志、分页等中间件：
+    - 认证通过：200，响应头 `X-User-Id`、`X-Session-Uuid`、`X-User-Admin`
+    - 认证失败：401
+
+nginx 示例::
+
+    location = /_auth {
+        internal;
+        proxy_pass http://127.0.0.1:6973/verify;
+        proxy_pass_request_body off;
+        proxy_set_header Content-Length "";
+    }
+
+    location /api/ {
+        auth_request /_auth;
+        auth_request_set $user_id $upstream_http_x_user_id;
+        proxy_set_header X-User-Id $user_id;
+        proxy_pass http://upstream;
+    }
+
+启用 `TOKEN_STATELESS_VERIFY` 后，缓存命中的请求不访问 Redis，吞吐量只受 CPU 限制
+"""
+
+from pathlib import Path
+
+from starlette.types import Receive, Scope, Send
+
+from backend.common.exception.errors import AuthorizationError, TokenError
+from backend.common.logger import log, register_logger
+from backend.common.security.jwt import jwt_authentication, jwt_decode
+from backend.common.security.presence import session_presence
+from backend.common.security.revocation import session_revocation
+from backend.core.config import settings
+from backend.database.redis import redis_client, redis_subscriber
+
+_VERIFY_PATH = "/verify"
+
+# 预先构造的响应，避免每次请求分配
+_EMPTY_BODY = {"type": "http.response.body", "body": b""}
+_NO_CONTENT_HEADERS = [(b"content-length", b"0")]
+_UNAUTHORIZED = {"type": "http.response.start", "status": 401, "headers": _NO_CONTENT_HEADERS}
+_NOT_FOUND = {"type": "http.response.start", "status": 404, "headers": _NO_CONTENT_HEADERS}
+_SERVER_ERROR = {"type": "http.response.start", "status": 500, "headers": _NO_CONTENT_HEADERS}
+
+
+def _get_bearer_token(scope: Scope) -> str | None:
+    """从请求头中提取 Bearer Token"""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.partition(b" ")
+            if scheme.lower() == b"bearer" and token:
+                return token.decode("latin-1")
+            return None
+    return None
+
+
+async def _lifespan(receive: Receive, send: Send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            register_logger()
+            await redis_client.open()
+            await redis_client.load_scripts()
+            await redis_subscriber.start()
+            await session_revocation.start()
+            await session_presence.start()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await session_presence.stop()
+            await session_revocation.stop()
+            await redis_subscriber.stop()
+            await redis_client.close()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope: Scope, receive: Receive, send: Send) -> None:
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+    if scope["path"] != _VERIFY_PATH:
+        await send(_NOT_FOUND)
+        await send(_EMPTY_BODY)
+        return
+
+    token = _get_bearer_token(scope)
+    if token is None:
+        await send(_UNAUTHORIZED)
+        await send(_EMPTY_BODY)
+        return
+
+    try:
+        user = await jwt_authentication(token)
+    except (TokenError, AuthorizationError):
+        await send(_UNAUTHORIZED)
+        await send(_EMPTY_BODY)
+        return
+    except Exception as e:
+        log.error(f"认证校验异常：{e}")
+        await send(_SERVER_ERROR)
+        await send(_EMPTY_BODY)
+        return
+
+    # 载荷已在 jwt_authentication 中缓存，此处不会重复解码
+    session_uuid = jwt_decode(token).session_uuid
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                *_NO_CONTENT_HEADERS,
+                (b"x-user-id", str(user.id).encode()),
+                (b"x-session-uuid", session_uuid.encode()),
+                (b"x-user-admin", b"1" if user.is_admin else b"0"),
+            ],
+        }
+    )
+    await send(_EMPTY_BODY)
+
+
+if __name__ == "__main__":
+    try:
+        import uvicorn
+
+        uvicorn.run(
+            app=f"backend.{Path(__file__).stem}:app",
+            host=settings.UVICORN_HOST,
+            port=settings.UVICORN_VERIFY_PORT,
+            access_log=False,
+        )
+    except Exception as e:
+        print(f"❌ Verify service start filed: {e}")